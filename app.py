@@ -1,25 +1,68 @@
 import streamlit as st
 import pandas as pd
-from PublicDataReader import TransactionPrice, code_bdong
+import numpy as np
 import datetime
 import re
 import math
-import os
-import json
 import hashlib
+import time
+from pipeline import (
+    load_region_index,
+    describe_region_ambiguity,
+    resolve_region_codes,
+    summarize_region_names,
+    build_fetch_jobs,
+    fetch_transactions,
+    standardize_columns,
+    to_numeric_series,
+    SUPPLY_PYEONG_BANDS,
+    to_supply_pyeong_band_series,
+    apply_apt_keyword_filter,
+    compile_filter_mask,
+    mask_digest,
+    search_table_rows,
+    sort_table_rows,
+    build_table_page_html,
+    get_display_labels,
+    build_dataset_meta,
+    build_metric_cube,
+    cube_cell_mask,
+    summarize_metric_cells,
+    summarize_metric_rows,
+    SHARED_DATASET_TTL_SEC,
+    SHARED_DATASET_MAX_BYTES,
+    build_transaction_dataset,
+    load_transaction_dataset,
+    plan_incremental_refresh,
+    merge_incremental_refresh,
+    get_loaded_partitions,
+    SharedDatasetStore,
+    CONVERSION_MIN_SAMPLES,
+    estimate_conversion_rates,
+    estimate_deposit_monthly_equivalent,
+)
+from charts import (
+    TREND_CHART_DEFAULT_TOP_N,
+    get_trade_chart_metric_options,
+    build_trade_chart_options,
+    bin_polar_points,
+    stratified_sample_positions,
+)
+from data_sources import get_data_source_name, requires_service_key
+from preferences import get_preference_store
+from exports import EXPORT_FORMATS
 try:
     from pyecharts import options as opts
-    from pyecharts.charts import Line, Bar, Polar
+    from pyecharts.charts import Polar
     from pyecharts.commons.utils import JsCode
-    from streamlit_echarts import st_pyecharts
+    from streamlit_echarts import st_pyecharts, st_echarts
     HAS_PYECHARTS = True
 except ModuleNotFoundError:
     opts = None
-    Line = None
-    Bar = None
     Polar = None
     JsCode = None
     st_pyecharts = None
+    st_echarts = None
     HAS_PYECHARTS = False
 
 try:
@@ -335,9 +378,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- API 키 설정 (Streamlit Secrets) ---
-if "service_key" in st.secrets:
-    SECRET_KEY = st.secrets["service_key"]
-else:
+try:
+    SECRET_KEY = st.secrets["service_key"] if "service_key" in st.secrets else None
+except Exception:
+    # secrets.toml이 없는 로컬/모의 소스 실행
     SECRET_KEY = None
 
 # --- 세션 상태 초기화 ---
@@ -349,6 +393,12 @@ if "trade_type_val" not in st.session_state:
     st.session_state.trade_type_val = "전월세"
 if "df_nonce" not in st.session_state:
     st.session_state.df_nonce = 0
+if "df_meta" not in st.session_state:
+    st.session_state.df_meta = None
+if "base_df" not in st.session_state:
+    st.session_state.base_df = None
+if "df_source" not in st.session_state:
+    st.session_state.df_source = None
 
 # 필터링 조건 유지를 위한 상태 초기화
 if "filter_deal_price" not in st.session_state: st.session_state.filter_deal_price = None
@@ -359,8 +409,6 @@ if "filter_floors" not in st.session_state: st.session_state.filter_floors = []
 if "filter_area_unit" not in st.session_state: st.session_state.filter_area_unit = "공급면적(평형대)"
 if "filter_supply_bands" not in st.session_state: st.session_state.filter_supply_bands = []
 
-USER_PREFS_PATH = os.path.join(os.path.dirname(__file__), ".user_prefs.json")
-
 def get_user_pref_key():
     """헤더/쿠키 기반 사용자 식별 키 생성"""
     raw = "anonymous"
@@ -391,33 +439,15 @@ def get_user_pref_key():
 
 def load_user_preferences(user_key):
     """사용자별 입력값 복원"""
-    if not os.path.exists(USER_PREFS_PATH):
-        return {}
     try:
-        with open(USER_PREFS_PATH, "r", encoding="utf-8") as f:
-            all_prefs = json.load(f)
-        if isinstance(all_prefs, dict):
-            value = all_prefs.get(user_key, {})
-            return value if isinstance(value, dict) else {}
+        return get_preference_store().get(user_key)
     except Exception:
-        pass
-    return {}
+        return {}
 
 def save_user_preferences(user_key, prefs):
     """사용자별 입력값 저장"""
     try:
-        all_prefs = {}
-        if os.path.exists(USER_PREFS_PATH):
-            with open(USER_PREFS_PATH, "r", encoding="utf-8") as f:
-                loaded = json.load(f)
-                if isinstance(loaded, dict):
-                    all_prefs = loaded
-        all_prefs[user_key] = prefs
-
-        temp_path = f"{USER_PREFS_PATH}.tmp"
-        with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(all_prefs, f, ensure_ascii=False, indent=2)
-        os.replace(temp_path, USER_PREFS_PATH)
+        get_preference_store().set(user_key, prefs)
     except Exception:
         pass
 
@@ -456,188 +486,42 @@ if "inputs_restored" not in st.session_state:
     st.session_state.apt_keyword_input = restored.get("apt_keyword", "")
     st.session_state.inputs_restored = True
 
-@st.cache_resource
-def load_bdong_data():
-    """법정동 코드 데이터 로드"""
-    try:
-        return code_bdong()
-    except Exception as e:
-        st.error(f"법정동 데이터를 불러올 수 없습니다: {e}")
-        return pd.DataFrame()
-
-def get_region_code(region_name):
-    """지역명을 입력받아 5자리 시군구 코드를 반환"""
-    try:
-        df = load_bdong_data()
-        if df.empty:
-            return None, None
-        
-        active_df = df[df['말소일자'].isna() | (df['말소일자'] == '')].copy()
-        mask = (active_df['시군구명'].str.contains(region_name, na=False)) | \
-               (active_df['읍면동명'].str.contains(region_name, na=False))
-        
-        results = active_df[mask]
-        if not results.empty:
-            target = results.iloc[0]
-            return str(target['시군구코드']), f"{target['시도명']} {target['시군구명']}"
-        return None, None
-    except Exception as e:
-        st.error(f"지역 코드 검색 중 오류: {e}")
-        return None, None
-
-def standardize_columns(df):
-    """API 반환 컬럼명을 앱에서 사용하는 표준 명칭으로 변경"""
-    df.columns = [col.strip() for col in df.columns]
-    mapping = {
-        '아파트': ['단지', '단지명', '건물명', 'aptNm', '아파트'],
-        '매매가': ['거래금액', '거래금액(만원)', 'dealAmount', '매매가'],
-        '보증금': ['보증금액', '보증금(만원)', 'deposit', '보증금'],
-        '월세': ['월세액', '월세(만원)', 'monthlyRent', '월세'],
-        '전용면적': ['excluUseAr', '전용면적(㎡)', '면적', '전용면적'],
-        '층': ['floor', '층수', '층'],
-        '년': ['dealYear', '년'],
-        '월': ['dealMonth', '월'],
-        '일': ['dealDay', '일']
-    }
-    for standard, candidates in mapping.items():
-        for col in candidates:
-            if col in df.columns:
-                df = df.rename(columns={col: standard})
-                break
-    return df
-
-def to_numeric_safe(x):
-    """문자열 숫자를 안전하게 숫자로 변환"""
-    if pd.isna(x) or x == '': return 0.0
-    val = re.sub(r'[^0-9.]', '', str(x))
-    return float(val) if val else 0.0
-
-SUPPLY_PYEONG_BANDS = [
-    ((39, 40), "16~18평형"),
-    ((49, 51), "20~22평형"),
-    ((59, 59), "24~26평형"),
-    ((72, 74), "28~30평형"),
-    ((84, 85), "32~35평형"),
-    ((101, 102), "39~41평형"),
-]
-
-SUPPLY_PYEONG_ANCHORS = [
-    (39.5, 17.0),
-    (50.0, 21.0),
-    (59.0, 25.0),
-    (73.0, 29.0),
-    (84.5, 33.5),
-    (101.5, 40.0),
-]
-
-SUPPLY_BAND_CENTERS = {
-    "16~18평형": 17.0,
-    "20~22평형": 21.0,
-    "24~26평형": 25.0,
-    "28~30평형": 29.0,
-    "32~35평형": 33.5,
-    "39~41평형": 40.0,
-}
+def get_nonce_scoped_cache(state_key):
+    """현재 데이터셋(df_nonce 기준) 전용 세션 캐시 (데이터 교체 시 비움)"""
+    holder = st.session_state.get(state_key)
+    if holder is None or holder.get("nonce") != st.session_state.df_nonce:
+        holder = {"nonce": st.session_state.df_nonce, "entries": {}}
+        st.session_state[state_key] = holder
+    return holder["entries"]
 
-def estimate_supply_pyeong(area_m2):
-    """기준 앵커를 이용해 전용면적(㎡)을 공급평수(평)로 선형 보간/외삽"""
-    if pd.isna(area_m2):
-        return None
+def get_filter_mask_cache():
+    """현재 데이터셋(df_nonce 기준) 전용 필터 마스크 캐시"""
+    return get_nonce_scoped_cache("filter_mask_cache")
 
-    x = float(area_m2)
-    anchors = SUPPLY_PYEONG_ANCHORS
-
-    if x <= anchors[0][0]:
-        x0, y0 = anchors[0]
-        x1, y1 = anchors[1]
-    elif x >= anchors[-1][0]:
-        x0, y0 = anchors[-2]
-        x1, y1 = anchors[-1]
-    else:
-        x0 = y0 = x1 = y1 = None
-        for i in range(len(anchors) - 1):
-            ax0, ay0 = anchors[i]
-            ax1, ay1 = anchors[i + 1]
-            if ax0 <= x <= ax1:
-                x0, y0, x1, y1 = ax0, ay0, ax1, ay1
-                break
-
-    if x1 == x0:
-        return y0
-    return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
-
-def to_supply_pyeong_band(area_m2):
-    """보간된 공급평수를 가장 가까운 평형대 라벨로 매핑"""
-    est = estimate_supply_pyeong(area_m2)
-    if est is None:
-        return None
-    return min(SUPPLY_BAND_CENTERS.keys(), key=lambda k: abs(SUPPLY_BAND_CENTERS[k] - est))
-
-def apply_apt_keyword_filter(df, expr):
-    """아파트 키워드 조건식(AND/OR/NOT)을 적용"""
-    if df is None or df.empty or '아파트' not in df.columns:
-        return df
-    if not expr or not str(expr).strip():
-        return df
-
-    q = str(expr).strip()
-    q = re.sub(r'\s+(?i:or)\s+', '|', q)
-    q = re.sub(r'\s+(?i:and)\s+', '&', q)
-    groups = [g.strip() for g in q.split('|') if g.strip()]
-    if not groups:
-        return df
-
-    name_series = df['아파트'].astype(str)
-    final_mask = pd.Series(False, index=df.index)
-
-    for g in groups:
-        terms = [t.strip() for t in re.split(r'&', g) if t.strip()]
-        include_terms = []
-        exclude_terms = []
-
-        for t in terms:
-            t_clean = t.strip()
-            if t_clean.startswith('-') or t_clean.startswith('!'):
-                word = t_clean[1:].strip()
-                if word:
-                    exclude_terms.append(word)
-            elif re.match(r'(?i)^not\s+', t_clean):
-                word = re.sub(r'(?i)^not\s+', '', t_clean).strip()
-                if word:
-                    exclude_terms.append(word)
-            else:
-                include_terms.append(t_clean)
-
-        group_mask = pd.Series(True, index=df.index)
-        for w in include_terms:
-            group_mask &= name_series.str.contains(w, na=False, case=False)
-        for w in exclude_terms:
-            group_mask &= ~name_series.str.contains(w, na=False, case=False)
-
-        final_mask |= group_mask
-
-    return df[final_mask]
-
-def apply_all_column_filters(df, key_prefix):
-    """출력용 데이터프레임의 모든 컬럼에 대해 동적 필터 적용"""
+def build_column_filter_specs(df, key_prefix, columns=None, base_mask=None, labels=None):
+    """컬럼 필터 위젯 상태를 필터 조건(spec) 목록으로 변환 (옵션은 base_mask 적용 행 기준)"""
     if df is None or df.empty:
-        return df, 0
+        return [], 0
 
+    labels = labels or {}
     selected_cols = st.multiselect(
         "필터 컬럼",
-        options=list(df.columns),
+        options=list(columns if columns is not None else df.columns),
         default=[],
+        format_func=lambda c: labels.get(c, c),
         key=f"{key_prefix}_selected_cols"
     )
 
     if not selected_cols:
-        return df, 0
+        return [], 0
 
-    mask = pd.Series(True, index=df.index)
+    specs = []
     active_count = 0
     for col in selected_cols:
-        with st.expander(f"조건 설정: {col}", expanded=False):
-            series = df[col]
+        col_label = labels.get(col, col)
+        with st.expander(f"조건 설정: {col_label}", expanded=False):
+            # 옵션 계산에 필요한 컬럼만 부분 추출하고, 실제 필터링은 마스크로 일괄 처리
+            series = df[col] if base_mask is None else df[col][base_mask]
             safe_col = re.sub(r'[^0-9a-zA-Z_가-힣]', '_', str(col))
 
             numeric_series = pd.to_numeric(series, errors='coerce')
@@ -653,7 +537,7 @@ def apply_all_column_filters(df, key_prefix):
                 )
 
                 if unit == "공급면적(평형대)":
-                    converted = numeric_series.apply(to_supply_pyeong_band)
+                    converted = to_supply_pyeong_band_series(numeric_series)
                     band_order = [label for _, label in SUPPLY_PYEONG_BANDS]
                     existing = [b for b in band_order if b in converted.dropna().unique().tolist()]
                     options = existing
@@ -671,7 +555,8 @@ def apply_all_column_filters(df, key_prefix):
                 )
                 if len(selected_vals) != len(options):
                     active_count += 1
-                mask &= converted.isin(selected_vals)
+                kind = "area_band_isin" if unit == "공급면적(평형대)" else "area_round_isin"
+                specs.append({"kind": kind, "col": col, "values": selected_vals})
                 continue
 
             # 숫자로 해석 가능한 컬럼은 범위 필터 제공
@@ -715,7 +600,7 @@ def apply_all_column_filters(df, key_prefix):
 
                     if len(selected_vals) != len(floor_values):
                         active_count += 1
-                    mask &= numeric_series.astype("Int64").isin(selected_vals)
+                    specs.append({"kind": "int_isin", "col": col, "values": selected_vals})
                     continue
 
                 if is_int_like:
@@ -723,7 +608,7 @@ def apply_all_column_filters(df, key_prefix):
                     slider_max = int(max_v)
                     step = 1 if slider_max - slider_min <= 200 else max(1, (slider_max - slider_min) // 200)
                     selected_range = st.slider(
-                        f"{col} 범위",
+                        f"{col_label} 범위",
                         min_value=slider_min,
                         max_value=slider_max,
                         value=(slider_min, slider_max),
@@ -732,7 +617,7 @@ def apply_all_column_filters(df, key_prefix):
                     )
                 else:
                     selected_range = st.slider(
-                        f"{col} 범위",
+                        f"{col_label} 범위",
                         min_value=min_v,
                         max_value=max_v,
                         value=(min_v, max_v),
@@ -741,7 +626,7 @@ def apply_all_column_filters(df, key_prefix):
 
                 if selected_range[0] > min_v or selected_range[1] < max_v:
                     active_count += 1
-                mask &= numeric_series.between(selected_range[0], selected_range[1], inclusive='both')
+                specs.append({"kind": "range", "col": col, "low": selected_range[0], "high": selected_range[1]})
                 continue
 
             # 문자열 컬럼은 고유값 수에 따라 다중선택/부분검색 제공
@@ -750,26 +635,26 @@ def apply_all_column_filters(df, key_prefix):
 
             if len(unique_vals) <= 100:
                 selected_vals = st.multiselect(
-                    f"{col} 값 선택",
+                    f"{col_label} 값 선택",
                     options=unique_vals,
                     default=unique_vals,
                     key=f"{key_prefix}_{safe_col}_values"
                 )
                 if len(selected_vals) != len(unique_vals):
                     active_count += 1
-                mask &= str_series.isin(selected_vals)
+                specs.append({"kind": "str_isin", "col": col, "values": selected_vals})
             else:
                 keyword = st.text_input(
-                    f"{col} 부분검색",
+                    f"{col_label} 부분검색",
                     value="",
                     key=f"{key_prefix}_{safe_col}_keyword",
-                    placeholder=f"{col}에 포함될 텍스트 입력"
+                    placeholder=f"{col_label}에 포함될 텍스트 입력"
                 )
                 if keyword:
                     active_count += 1
-                    mask &= str_series.str.contains(keyword, na=False, case=False)
+                    specs.append({"kind": "contains", "col": col, "keyword": keyword})
 
-    return df[mask], active_count
+    return specs, active_count
 
 def reset_filter_state(key_prefix):
     """기본 필터/동적 컬럼 필터 상태 초기화"""
@@ -786,8 +671,25 @@ def reset_filter_state(key_prefix):
     for k in delete_keys:
         del st.session_state[k]
 
-def render_awesome_table(df):
-    """실거래 리스트를 AwesomeTable로 렌더링"""
+TABLE_PAGE_SIZES = [25, 50, 100, 200]
+TABLE_PAGE_CACHE_MAX = 64
+
+def get_table_page_cache():
+    """현재 데이터셋(df_nonce 기준) 전용 테이블 페이지 HTML 캐시 (정렬 순서는 최근 1개만 "order" 키에 보관)"""
+    return get_nonce_scoped_cache("table_page_cache")
+
+def cache_table_entry(cache, key, value):
+    """테이블 페이지 HTML 캐시에 항목 저장 (상한 도달 시 페이지 항목 비움, 최근 정렬 순서는 유지)"""
+    if len(cache) >= TABLE_PAGE_CACHE_MAX:
+        order = cache.get("order")
+        cache.clear()
+        if order is not None:
+            cache["order"] = order
+    cache[key] = value
+    return value
+
+def render_awesome_table(df, cache_key=None, key_prefix="deal_table"):
+    """실거래 리스트를 페이지 단위로 렌더링 (검색·정렬은 서버에서 처리하고 페이지 HTML은 필터 상태별 캐시)"""
     if df is None or df.empty:
         st.info("표시할 데이터가 없습니다.")
         return
@@ -833,25 +735,80 @@ def render_awesome_table(df):
 }
 </style>"""
 
-    safe_df = df.copy().fillna("")
-    safe_df.columns = [str(col) for col in safe_df.columns]
-    table_html = safe_df.to_html(
-        index=False,
-        classes="modern-deal-table",
-        border=0,
-        escape=True,
-    )
+    sort_options = ["기본 (최신순)"] + [str(c) for c in df.columns]
+    c_search, c_sort, c_order, c_size = st.columns([2.2, 1.4, 1, 0.9])
+    with c_search:
+        search = st.text_input("리스트 검색", key=f"{key_prefix}_search", placeholder="단지명, 면적, 층 등").strip()
+    with c_sort:
+        sort_label = st.selectbox("정렬 기준", sort_options, key=f"{key_prefix}_sort")
+    with c_order:
+        ascending = st.radio("정렬 방향", ["내림차순", "오름차순"], key=f"{key_prefix}_order", horizontal=True) == "오름차순"
+    with c_size:
+        page_size = st.selectbox("페이지 크기", TABLE_PAGE_SIZES, index=1, key=f"{key_prefix}_size")
+
+    cache = get_table_page_cache() if cache_key is not None else {}
+    sort_col = None if sort_label == sort_options[0] else df.columns[sort_options.index(sort_label) - 1]
+    order_key = (cache_key, search, sort_col, ascending if sort_col is not None else None)
+    if not search and sort_col is None:
+        # 기본 순서는 캐시하지 않음 (행 수만큼의 배열을 세션에 쌓지 않도록)
+        positions = np.arange(len(df))
+    else:
+        # 검색/정렬 순서는 전체 행 길이 배열이므로 가장 최근 1개 상태만 보관
+        cached_order = cache.get("order")
+        if cached_order is not None and cached_order[0] == order_key:
+            positions = cached_order[1]
+        else:
+            positions = search_table_rows(df, search) if search else np.arange(len(df))
+            if sort_col is not None:
+                positions = sort_table_rows(df, positions, sort_col, ascending)
+            if cache_key is not None:
+                cache["order"] = (order_key, positions)
+
+    total_rows = len(positions)
+    total_pages = max(1, math.ceil(total_rows / page_size))
+    page_key = f"{key_prefix}_page"
+    view_state = order_key + (page_size,)
+    if st.session_state.get(f"{key_prefix}_view") != view_state:
+        # 필터/검색/정렬/페이지 크기가 바뀌면 첫 페이지부터 표시
+        st.session_state[f"{key_prefix}_view"] = view_state
+        st.session_state[page_key] = 1
+    elif st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+
+    c_info, c_page = st.columns([4, 1])
+    with c_page:
+        page = int(st.number_input("페이지", min_value=1, max_value=total_pages, step=1, key=page_key))
+    with c_info:
+        first_row = (page - 1) * page_size
+        last_row = min(first_row + page_size, total_rows)
+        st.caption(
+            f"총 {total_rows:,}건 중 {first_row + 1 if total_rows else 0:,}–{last_row:,}건 표시 · {page}/{total_pages} 페이지"
+        )
+
+    if total_rows == 0:
+        st.info("검색 조건에 맞는 거래가 없습니다.")
+        return
+
+    html_key = ("page",) + order_key + (page_size, page)
+    page_html = cache.get(html_key)
+    if page_html is None:
+        # 현재 페이지 행만 문자열/HTML로 변환
+        table_html = build_table_page_html(df, positions[first_row:last_row])
+        page_html = f"<div class='modern-deal-table-wrap'>{table_html}</div>"
+        if cache_key is not None:
+            cache_table_entry(cache, html_key, page_html)
+
     st.markdown(table_css, unsafe_allow_html=True)
-    st.markdown(f"<div class='modern-deal-table-wrap'>{table_html}</div>", unsafe_allow_html=True)
+    st.markdown(page_html, unsafe_allow_html=True)
     return
 
     if HAS_AWESOME_TABLE and False:
         try:
-            AwesomeTable(safe_df, show_order=True, show_search=True)
+            AwesomeTable(df, show_order=True, show_search=True)
             return
         except Exception as e:
             st.warning(f"AwesomeTable 렌더링에 실패해 기본 테이블로 대체합니다: {e}")
-    st.dataframe(safe_df, use_container_width=True, hide_index=True)
+    st.dataframe(df, use_container_width=True, hide_index=True)
 
 def render_metric_card(title, content, description, key):
     """Dashboard KPI 카드 렌더링"""
@@ -873,424 +830,185 @@ def render_metric_card(title, content, description, key):
         unsafe_allow_html=True,
     )
 
-def make_period_frame(df):
-    """거래일 기준 월 단위 집계 프레임 생성"""
-    if df is None or df.empty:
-        return pd.DataFrame()
-    if not all(c in df.columns for c in ['년', '월']):
-        return pd.DataFrame()
-
-    work = df.copy()
-    if '일' in work.columns:
-        day_vals = pd.to_numeric(work['일'], errors='coerce').fillna(1).astype(int)
-    else:
-        day_vals = pd.Series(1, index=work.index)
+STREAM_RENDER_INTERVAL_SEC = 0.5
+STREAM_PREVIEW_ROWS = 10
+
+class StreamingPreview:
+    """월별 수집 결과가 도착할 때마다 KPI·월별 건수·최근 거래를 점진적으로 갱신하는 미리보기"""
+
+    def __init__(self, trade_type, total):
+        self.trade_type = trade_type
+        self.total = total
+        self.done = 0
+        self.rows = 0
+        self.month_counts = {}
+        self.price_sum = 0.0
+        self.price_count = 0
+        self.latest_ym = ""
+        self.latest_frames = []
+        self._holder = None
+        self._last_render = 0.0
+
+    def update(self, job, frame):
+        """수집 완료된 (시군구, 연월) 결과를 누적하고 일정 간격으로 화면 갱신"""
+        _, ym = job
+        self.done += 1
+        if frame is not None and not frame.empty:
+            work = standardize_columns(frame.copy(deep=False))
+            label = f"{ym[:4]}-{ym[4:]}"
+            self.rows += len(work)
+            self.month_counts[label] = self.month_counts.get(label, 0) + len(work)
+
+            price_col = '매매가' if self.trade_type == "매매" else '보증금'
+            if price_col in work.columns:
+                values = to_numeric_series(work[price_col])
+                values = values[values > 0]
+                self.price_sum += float(values.sum())
+                self.price_count += int(len(values))
+
+            if ym > self.latest_ym:
+                self.latest_ym, self.latest_frames = ym, [work]
+            elif ym == self.latest_ym:
+                self.latest_frames.append(work)
+
+        now = time.monotonic()
+        if self.done >= self.total or now - self._last_render >= STREAM_RENDER_INTERVAL_SEC:
+            self._last_render = now
+            self.render()
+
+    def render(self):
+        if self._holder is None:
+            self._holder = st.empty()
+        with self._holder.container():
+            st.progress(
+                min(1.0, self.done / max(self.total, 1)),
+                text=f"📥 {self.done}/{self.total}개월 수집 완료 · 누적 {self.rows:,}건"
+            )
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                render_metric_card("수집 거래", f"{self.rows:,}건", "지금까지 도착한 거래", key="stream_total")
+            with c2:
+                avg_label = "평균 매매" if self.trade_type == "매매" else "평균 보증금"
+                avg = self.price_sum / self.price_count if self.price_count else 0
+                render_metric_card(avg_label, f"{avg:,.0f}만", "수집 중 잠정 평균", key="stream_avg")
+            with c3:
+                render_metric_card("수집 월", f"{len(self.month_counts):,}개월", "거래가 확인된 월", key="stream_months")
+
+            if self.month_counts:
+                counts = pd.Series(self.month_counts, name="거래 건수").sort_index()
+                st.bar_chart(counts, height=220)
+            if self.latest_frames:
+                head = pd.concat(self.latest_frames, ignore_index=True)
+                cols = [c for c in ['아파트', '전용면적', '층', '매매가', '보증금', '월세', '년', '월', '일'] if c in head.columns]
+                st.caption(f"최근 수집 월({self.latest_ym[:4]}-{self.latest_ym[4:]}) 거래 미리보기")
+                st.dataframe(head[cols].head(STREAM_PREVIEW_ROWS), use_container_width=True, hide_index=True)
+
+    def finish(self):
+        """수집 완료 후 미리보기 영역 제거 (본 대시보드로 대체)"""
+        if self._holder is not None:
+            self._holder.empty()
+
+def get_dataset_meta():
+    """현재 데이터셋(df_nonce 기준)의 메타 정보 반환 (데이터 교체 시에만 재계산)"""
+    cached = st.session_state.get("df_meta")
+    if cached is None or cached.get("nonce") != st.session_state.df_nonce:
+        cached = build_dataset_meta(st.session_state.df)
+        cached["nonce"] = st.session_state.df_nonce
+        st.session_state.df_meta = cached
+    return cached
+
+def get_metric_cube():
+    """현재 데이터셋(df_nonce 기준)의 월별 집계 큐브 반환 (데이터 교체 시에만 재계산)"""
+    cached = st.session_state.get("df_cube")
+    if cached is None or cached.get("nonce") != st.session_state.df_nonce:
+        cached = build_metric_cube(st.session_state.df)
+        cached["nonce"] = st.session_state.df_nonce
+        st.session_state.df_cube = cached
+    return cached
 
-    date_str = (
-        pd.to_numeric(work['년'], errors='coerce').fillna(0).astype(int).astype(str).str.zfill(4) + "-" +
-        pd.to_numeric(work['월'], errors='coerce').fillna(0).astype(int).astype(str).str.zfill(2) + "-" +
-        day_vals.astype(str).str.zfill(2)
-    )
-    work['deal_date'] = pd.to_datetime(date_str, errors='coerce')
-    work = work.dropna(subset=['deal_date']).sort_values('deal_date')
-    if work.empty:
-        return pd.DataFrame()
+@st.cache_resource
+def get_shared_dataset_store():
+    """프로세스 전역 공유 데이터셋 저장소 (세션 간 동일 조회 결과를 1벌만 보관)"""
+    return SharedDatasetStore(SHARED_DATASET_TTL_SEC, SHARED_DATASET_MAX_BYTES)
 
-    work['period'] = work['deal_date'].dt.to_period('M').astype(str)
-    return work
+CHART_PAYLOAD_CACHE_MAX = 16
+TREND_CHART_TOP_N_OPTIONS = [5, 10, 20, 30]
 
-def render_trade_type_chart(df, trade_type):
-    """거래유형별 기간-가격 상관 차트 렌더링 (pyecharts)"""
+def render_trade_type_chart(df, trade_type, cache_key=None, cells=None):
+    """거래유형별 기간-가격 상관 차트 렌더링 (옵션은 데이터셋·필터·지표별로 세션 캐시, cells 지정 시 큐브 셀로 집계)"""
     if not HAS_PYECHARTS:
         st.error("차트 라이브러리(pyecharts)가 설치되지 않았습니다. `pip install -r requirements.txt` 후 다시 실행해주세요.")
         return
-
-    base = make_period_frame(df)
-    if base.empty:
+    if df is None or df.empty:
         st.info("차트를 그릴 기간 데이터가 부족합니다.")
         return
 
-    def axis_bounds(values, pad_ratio=0.08, force_int=False):
-        vals = [float(v) for v in values if pd.notna(v)]
-        if not vals:
-            return 0, 1
-        v_min, v_max = min(vals), max(vals)
-        if v_min == v_max:
-            pad = max(abs(v_min) * 0.1, 1.0)
-            low, high = v_min - pad, v_max + pad
-        else:
-            span = v_max - v_min
-            pad = span * pad_ratio
-            low, high = max(0, v_min - pad), v_max + pad
-
-        if force_int:
-            low = int(math.floor(low))
-            high = int(math.ceil(high))
-            if low == high:
-                high = low + 1
-            return low, high
-
-        # 부동소수점 노이즈(예: 7.14800000002) 제거용 축값 정규화
-        max_abs = max(abs(low), abs(high))
-        if max_abs >= 1000:
-            digits = 0
-        elif max_abs >= 100:
-            digits = 1
-        elif max_abs >= 10:
-            digits = 1
-        elif max_abs >= 1:
-            digits = 2
-        else:
-            digits = 3
-
-        low = round(low, digits)
-        high = round(high, digits)
-        if low == high:
-            high = round(high + (10 ** (-digits)), digits)
-        return low, high
-
-    def build_avg_markline(avg_value, label, color):
-        if avg_value is None or pd.isna(avg_value):
-            return None
-        return opts.MarkLineOpts(
-            symbol=["none", "none"],
-            is_silent=True,
-            linestyle_opts=opts.LineStyleOpts(color=color, width=1.6, type_="dotted"),
-            label_opts=opts.LabelOpts(
-                is_show=True,
-                formatter=f"{label} 평균: {{c}}",
-                color=color,
-                font_size=11,
-            ),
-            data=[opts.MarkLineItem(name=f"{label} 평균", y=round(float(avg_value), 1))],
-        )
-
-    def calculate_regression_line(y_values):
-        """주어진 값들의 선형 회귀 추세선 값을 계산하여 반환"""
-        indices = [i for i, v in enumerate(y_values) if v is not None and not pd.isna(v)]
-        valid_vals = [float(y_values[i]) for i in indices]
-        
-        if len(indices) < 2:
-            return [None] * len(y_values)
-        
-        n = len(indices)
-        x_sum = sum(indices)
-        y_sum = sum(valid_vals)
-        xy_sum = sum(i * v for i, v in zip(indices, valid_vals))
-        x2_sum = sum(i * i for i in indices)
-        
-        denom = (n * x2_sum - x_sum**2)
-        if denom == 0:
-            return [None] * len(y_values)
-            
-        slope = (n * xy_sum - x_sum * y_sum) / denom
-        intercept = (y_sum - slope * x_sum) / n
-        
-        return [round(slope * i + intercept, 1) for i in range(len(y_values))]
-
-    if trade_type == "전월세":
-        metric_options = []
-        if '보증금_num' in base.columns:
-            metric_options.append(("보증금", "보증금_num", "보증금(만원)"))
-        if '월세_num' in base.columns:
-            metric_options.append(("월세", "월세_num", "월세(만원)"))
-        if {'보증금_num', '월세_num'}.issubset(base.columns):
-            metric_options.append(("보증금+월세", "combined", "금액(만원)"))
-        if not metric_options:
+    metric_options = get_trade_chart_metric_options(df, trade_type)
+    if not metric_options:
+        if trade_type == "전월세":
             st.info("전월세 차트를 위한 보증금/월세 데이터가 부족합니다.")
-            return
-
-        metric_map = {label: (col, y_name) for label, col, y_name in metric_options}
-        metric_choice = st.radio(
-            "전월세 차트 지표",
-            options=[m[0] for m in metric_options],
-            horizontal=True,
-            key="rental_chart_metric"
-        )
-        value_col, y_axis_name = metric_map[metric_choice]
-    else:
-        if '매매가_num' not in base.columns:
+        else:
             st.info("매매 차트를 위한 매매가 데이터가 부족합니다.")
-            return
-        value_col, y_axis_name = "매매가_num", "매매가(만원)"
-        metric_choice = "매매가"
-
-    apt_series = pd.Series(["전체"] * len(base), index=base.index)
-    if '아파트' in base.columns:
-        apt_series = base['아파트'].astype(str).replace("nan", "").replace("", "미상")
-    base = base.assign(_apt=apt_series)
-    apt_names = [n for n in sorted(base['_apt'].dropna().unique().tolist()) if str(n).strip() != ""]
-    multi_apt = len(apt_names) >= 2
-
-    monthly_cnt = (
-        base.groupby('period', as_index=False)
-        .agg(거래건수=('period', 'count'))
-        .sort_values('period')
-    )
-    x_data = monthly_cnt['period'].tolist()
-    cnt_month = monthly_cnt['거래건수'].tolist()
-    cnt_min, cnt_max = axis_bounds(cnt_month, 0.2, force_int=True)
-
-    all_values = []
-    dep_values_all = []
-    rent_values_all = []
-    combined_dual_axis = trade_type == "전월세" and metric_choice == "보증금+월세"
-    dep_avg_markline = None
-    rent_avg_markline = None
-    single_avg_markline = None
-
-    if combined_dual_axis:
-        dep_avg = pd.to_numeric(base.get('보증금_num'), errors='coerce').mean()
-        rent_avg = pd.to_numeric(base.get('월세_num'), errors='coerce').mean()
-        dep_avg_markline = build_avg_markline(dep_avg, "보증금", "#0369a1")
-        rent_avg_markline = build_avg_markline(rent_avg, "월세", "#c2410c")
-    else:
-        single_avg = pd.to_numeric(base.get(value_col), errors='coerce').mean()
-        single_avg_markline = build_avg_markline(single_avg, metric_choice, "#0f766e")
-
-    line = Line()
-    line.add_xaxis(x_data)
-    if combined_dual_axis:
-        dep_monthly = (
-            base.groupby(['period', '_apt'], as_index=False)
-            .agg(value=('보증금_num', 'mean'))
-        )
-        dep_pivot = dep_monthly.pivot(index='period', columns='_apt', values='value').reindex(x_data)
-
-        rent_monthly = (
-            base.groupby(['period', '_apt'], as_index=False)
-            .agg(value=('월세_num', 'mean'))
-        )
-        rent_pivot = rent_monthly.pivot(index='period', columns='_apt', values='value').reindex(x_data)
-
-        for apt in dep_pivot.columns.tolist():
-            dep_values = dep_pivot[apt].round(1).tolist()
-            dep_values_all.extend([v for v in dep_values if pd.notna(v)])
-            all_values.extend([v for v in dep_values if pd.notna(v)])
-            dep_line_values = [None if pd.isna(v) else float(v) for v in dep_values]
-            line.add_yaxis(
-                f"{apt} 보증금",
-                dep_line_values,
-                yaxis_index=0,
-                is_smooth=True,
-                symbol="none",
-                is_connect_nones=True,
-                label_opts=opts.LabelOpts(is_show=False),
-                linestyle_opts=opts.LineStyleOpts(width=2.4, type_="solid"),
-                markline_opts=dep_avg_markline,
-            )
-
-        for apt in rent_pivot.columns.tolist():
-            rent_values = rent_pivot[apt].round(1).tolist()
-            rent_values_all.extend([v for v in rent_values if pd.notna(v)])
-            all_values.extend([v for v in rent_values if pd.notna(v)])
-            rent_line_values = [None if pd.isna(v) else float(v) for v in rent_values]
-            line.add_yaxis(
-                f"{apt} 월세",
-                rent_line_values,
-                yaxis_index=1,
-                is_smooth=True,
-                symbol="none",
-                is_connect_nones=True,
-                label_opts=opts.LabelOpts(is_show=False),
-                linestyle_opts=opts.LineStyleOpts(width=2.0, type_="dashed"),
-                markline_opts=rent_avg_markline,
-            )
-
-        # 추세선 추가
-        dep_avg_monthly = dep_pivot.mean(axis=1).tolist()
-        dep_trend = calculate_regression_line(dep_avg_monthly)
-        line.add_yaxis(
-            "보증금 추세선",
-            dep_trend,
-            yaxis_index=0,
-            is_smooth=True,
-            symbol="none",
-            is_connect_nones=True,
-            label_opts=opts.LabelOpts(is_show=False),
-            linestyle_opts=opts.LineStyleOpts(width=2.8, type_="dotted", color="#0369a1"),
-            itemstyle_opts=opts.ItemStyleOpts(color="#0369a1"),
-        )
-
-        rent_avg_monthly = rent_pivot.mean(axis=1).tolist()
-        rent_trend = calculate_regression_line(rent_avg_monthly)
-        line.add_yaxis(
-            "월세 추세선",
-            rent_trend,
-            yaxis_index=1,
-            is_smooth=True,
-            symbol="none",
-            is_connect_nones=True,
-            label_opts=opts.LabelOpts(is_show=False),
-            linestyle_opts=opts.LineStyleOpts(width=2.5, type_="dotted", color="#c2410c"),
-            itemstyle_opts=opts.ItemStyleOpts(color="#c2410c"),
-        )
-    else:
-        apt_monthly = (
-            base.groupby(['period', '_apt'], as_index=False)
-            .agg(value=(value_col, 'mean'))
-        )
-        pivot = apt_monthly.pivot(index='period', columns='_apt', values='value').reindex(x_data)
-
-        for apt in pivot.columns.tolist():
-            values = pivot[apt].round(1).tolist()
-            all_values.extend([v for v in values if pd.notna(v)])
-            line_values = [None if pd.isna(v) else float(v) for v in values]
-            line.add_yaxis(
-                f"{apt}",
-                line_values,
-                is_smooth=True,
-                symbol="none",
-                is_connect_nones=True,
-                label_opts=opts.LabelOpts(is_show=False),
-                linestyle_opts=opts.LineStyleOpts(width=2.4, type_="solid"),
-                markline_opts=single_avg_markline,
-            )
-
-        # 추세선 추가
-        avg_monthly = pivot.mean(axis=1).tolist()
-        trend = calculate_regression_line(avg_monthly)
-        trend_label = f"{metric_choice} 추세선"
-        trend_color = "#ef4444" if trade_type == "매매" else "#0f766e"
-        line.add_yaxis(
-            trend_label,
-            trend,
-            is_smooth=True,
-            symbol="none",
-            is_connect_nones=True,
-            label_opts=opts.LabelOpts(is_show=False),
-            linestyle_opts=opts.LineStyleOpts(width=2.8, type_="dotted", color=trend_color),
-            itemstyle_opts=opts.ItemStyleOpts(color=trend_color),
-        )
+        return
 
-    val_min, val_max = axis_bounds(all_values, 0.12)
-
-    cnt_axis_index = 1
-    if combined_dual_axis:
-        rent_min, rent_max = axis_bounds(rent_values_all, 0.12)
-        dep_min, dep_max = axis_bounds(dep_values_all, 0.12)
-        line.extend_axis(
-            yaxis=opts.AxisOpts(
-                name="월세(만원)",
-                type_="value",
-                position="right",
-                min_=rent_min,
-                max_=rent_max,
-                axislabel_opts=opts.LabelOpts(formatter="{value}"),
+    metric_map = {label: (col, y_name) for label, col, y_name in metric_options}
+    c_metric, c_top = st.columns([3, 1])
+    with c_metric:
+        if trade_type == "전월세":
+            metric_choice = st.radio(
+                "전월세 차트 지표",
+                options=[m[0] for m in metric_options],
+                horizontal=True,
+                key="rental_chart_metric"
             )
+        else:
+            metric_choice = metric_options[0][0]
+    with c_top:
+        top_n = st.selectbox(
+            "표시 단지 수",
+            TREND_CHART_TOP_N_OPTIONS,
+            index=TREND_CHART_TOP_N_OPTIONS.index(TREND_CHART_DEFAULT_TOP_N),
+            key="trend_chart_top_n",
+            help="거래량 상위 단지만 개별 라인으로 표시하고 나머지는 '기타'로 합칩니다."
         )
-        cnt_axis_index = 2
-    else:
-        dep_min, dep_max = val_min, val_max
-
-    line.extend_axis(
-        yaxis=opts.AxisOpts(
-            name="거래건수(건)",
-            type_="value",
-            position="right",
-            offset=56 if combined_dual_axis else 0,
-            min_=cnt_min,
-            max_=cnt_max,
-            axislabel_opts=opts.LabelOpts(formatter="{value}"),
-        )
-    )
+    value_col, y_axis_name = metric_map[metric_choice]
 
-    bar = Bar()
-    bar.add_xaxis(x_data)
-    if multi_apt:
-        cnt_by_apt = (
-            base.groupby(['period', '_apt'], as_index=False)
-            .agg(cnt=('period', 'count'))
-            .pivot(index='period', columns='_apt', values='cnt')
-            .reindex(x_data)
-            .fillna(0)
-        )
-        for apt in cnt_by_apt.columns.tolist():
-            bar.add_yaxis(
-                f"{apt} 거래건수",
-                cnt_by_apt[apt].astype(int).tolist(),
-                yaxis_index=cnt_axis_index,
-                stack="apt_cnt",
-                bar_width="60%",
-                category_gap="78%",
-                label_opts=opts.LabelOpts(is_show=False),
-                itemstyle_opts=opts.ItemStyleOpts(opacity=0.28),
-            )
+    cache = get_nonce_scoped_cache("chart_payload_cache") if cache_key is not None else {}
+    payload_key = (cache_key, trade_type, metric_choice, top_n)
+    if payload_key in cache:
+        chart_options = cache[payload_key]
     else:
-        bar.add_yaxis(
-            "월별 거래건수",
-            cnt_month,
-            yaxis_index=cnt_axis_index,
-            bar_width="60%",
-            category_gap="78%",
-            label_opts=opts.LabelOpts(is_show=False),
-            itemstyle_opts=opts.ItemStyleOpts(color="rgba(148, 163, 184, 0.20)"),
-        )
-
-    line.overlap(bar)
-    title = f"월평균 추세 + 월별 거래건수 ({'전월세' if trade_type == '전월세' else '매매'})"
-    subtitle = f"지표: {metric_choice} · {'아파트별 라인' if multi_apt else '단일 라인'} · 평균 가이드 및 추세선 포함"
-    line.set_global_opts(
-        title_opts=opts.TitleOpts(title=title, subtitle=subtitle),
-        tooltip_opts=opts.TooltipOpts(trigger="axis"),
-        legend_opts=opts.LegendOpts(pos_top="4%", type_="scroll"),
-        xaxis_opts=opts.AxisOpts(type_="category", boundary_gap=False),
-        yaxis_opts=opts.AxisOpts(
-            name="보증금(만원)" if combined_dual_axis else y_axis_name,
-            type_="value",
-            min_=dep_min,
-            max_=dep_max,
-        ),
-        datazoom_opts=[
-            opts.DataZoomOpts(type_="inside", range_start=0, range_end=100),
-            opts.DataZoomOpts(type_="slider", range_start=0, range_end=100)
-        ],
-    )
-    st_pyecharts(line, height="500px")
+        chart_options = build_trade_chart_options(df, trade_type, metric_choice, value_col, y_axis_name, top_n=top_n, cells=cells)
+        if cache_key is not None:
+            if len(cache) >= CHART_PAYLOAD_CACHE_MAX:
+                cache.clear()
+            cache[payload_key] = chart_options
 
-def estimate_deposit_monthly_equivalent(df):
-    """전월세 데이터로 보증금 1000만원당 월세 환산액(선형회귀 기울기 기반) 추정"""
-    if df is None or df.empty:
-        return None
-    if "보증금_num" not in df.columns or "월세_num" not in df.columns:
-        return None
-
-    work = df[["보증금_num", "월세_num"]].copy()
-    work["보증금_num"] = pd.to_numeric(work["보증금_num"], errors="coerce")
-    work["월세_num"] = pd.to_numeric(work["월세_num"], errors="coerce")
-    work = work.dropna()
-    if work.empty or len(work) < 8:
-        return None
-
-    x = work["보증금_num"].astype(float)
-    y = work["월세_num"].astype(float)
-    if x.nunique() < 2:
-        return None
-
-    x_mean = float(x.mean())
-    y_mean = float(y.mean())
-    denom = float(((x - x_mean) ** 2).sum())
-    if denom <= 0:
-        return None
-
-    slope = float(((x - x_mean) * (y - y_mean)).sum() / denom)
-    intercept = y_mean - slope * x_mean
-    y_hat = intercept + slope * x
-
-    ss_res = float(((y - y_hat) ** 2).sum())
-    ss_tot = float(((y - y_mean) ** 2).sum())
-    r2 = 0.0 if ss_tot <= 0 else max(0.0, 1.0 - (ss_res / ss_tot))
-
-    return {
-        "monthly_per_1000": slope * 1000.0,
-        "slope": slope,
-        "intercept": intercept,
-        "r2": r2,
-        "n": int(len(work)),
-    }
+    if chart_options is None:
+        st.info("차트를 그릴 기간 데이터가 부족합니다.")
+        return
+    st_echarts(options=chart_options, height="500px")
+
+CONVERSION_METHODS = {"OLS": "ols", "Huber": "huber", "Theil-Sen": "theil_sen"}
+CONVERSION_SEGMENTS = {"공급평형대": "공급평형대", "단지": "아파트", "계약월": "period"}
+CONVERSION_CACHE_MAX = 32
+
+def get_cached_conversion_rates(df, cache_key, segment_col=None, method="ols"):
+    """현재 데이터셋·필터 상태별 환산율 추정 결과 캐시"""
+    cache = get_nonce_scoped_cache("conversion_cache") if cache_key is not None else {}
+    key = (cache_key, segment_col, method)
+    if key not in cache:
+        if len(cache) >= CONVERSION_CACHE_MAX:
+            cache.clear()
+        cache[key] = estimate_conversion_rates(df, segment_col=segment_col, method=method)
+    return cache[key]
+
+POLAR_POINT_BUDGETS = [1000, 2000, 5000]
+POLAR_DEFAULT_POINT_BUDGET = 2000
+POLAR_RENDER_MODES = ["자동", "격자 집계", "층화 표본", "전체"]
 
 def render_rental_polar_scatter(df):
-    """전월세 데이터의 보증금-월세 분포를 Polar Scatter로 렌더링"""
+    """전월세 데이터의 보증금-월세 분포를 Polar Scatter로 렌더링 (점 예산 초과 시 격자 집계/표본)"""
     if not HAS_PYECHARTS:
         return
     if df is None or df.empty:
@@ -1309,10 +1027,43 @@ def render_rental_polar_scatter(df):
         st.info("Polar Scatter를 표시할 유효한 전월세 데이터가 없습니다.")
         return
 
-    deposits = scatter_df["보증금_num"].astype(float)
-    rents = scatter_df["월세_num"].astype(float)
-    # Polar 좌표는 [radius, angle] 순서이므로 [보증금, 월세]로 전달
-    points = list(zip(deposits.round(1).tolist(), rents.round(1).tolist()))
+    c_mode, c_budget = st.columns([3, 1])
+    with c_mode:
+        render_mode = st.radio("표시 방식", POLAR_RENDER_MODES, horizontal=True, key="polar_render_mode")
+    with c_budget:
+        point_budget = st.selectbox(
+            "점 예산",
+            POLAR_POINT_BUDGETS,
+            index=POLAR_POINT_BUDGETS.index(POLAR_DEFAULT_POINT_BUDGET),
+            key="polar_point_budget",
+            help="표시할 최대 점 수입니다. 자동 모드에서는 예산을 넘으면 격자 집계로 전환합니다."
+        )
+
+    deposits = scatter_df["보증금_num"].to_numpy(dtype=float)
+    rents = scatter_df["월세_num"].to_numpy(dtype=float)
+    total_points = len(deposits)
+    if render_mode == "자동":
+        render_mode = "전체" if total_points <= point_budget else "격자 집계"
+
+    if render_mode == "격자 집계":
+        binned = bin_polar_points(deposits, rents, point_budget)
+        max_count = float(binned["count"].max())
+        # 셀 건수에 비례하도록 점 크기를 면적 기준으로 조정
+        sizes = 4 + 18 * np.sqrt(binned["count"].to_numpy() / max_count)
+        points = [
+            {"value": [round(dep, 1), round(rent, 1), int(cnt)], "symbolSize": round(float(size), 1)}
+            for dep, rent, cnt, size in zip(binned["dep"], binned["rent"], binned["count"], sizes)
+        ]
+        subtitle = f"거래 {total_points:,}건을 {len(points):,}개 격자로 집계했습니다. 점 크기는 거래 건수를 의미합니다."
+    else:
+        if render_mode == "층화 표본":
+            positions = stratified_sample_positions(deposits, rents, point_budget)
+            subtitle = f"거래 {total_points:,}건 중 {len(positions):,}건을 분포 구간별로 고르게 표본 추출했습니다."
+        else:
+            positions = np.arange(total_points)
+            subtitle = "각 점은 한 건의 전월세 거래를 의미합니다."
+        # Polar 좌표는 [radius, angle] 순서이므로 [보증금, 월세]로 전달
+        points = list(zip(np.round(deposits[positions], 1).tolist(), np.round(rents[positions], 1).tolist()))
 
     dep_min, dep_max = float(deposits.min()), float(deposits.max())
     rent_min, rent_max = float(rents.min()), float(rents.max())
@@ -1344,22 +1095,157 @@ def render_rental_polar_scatter(df):
     chart.set_global_opts(
         title_opts=opts.TitleOpts(
             title="보증금-월세 Polar Scatter",
-            subtitle="각 점은 한 건의 전월세 거래를 의미합니다.",
+            subtitle=subtitle,
         ),
         tooltip_opts=opts.TooltipOpts(
             trigger="item",
-            formatter=JsCode("function (params) { var v = params.value || []; return v[0] + ' / ' + v[1]; }"),
+            formatter=JsCode("function (params) { var v = params.value || []; return v[0] + ' / ' + v[1] + (v.length > 2 ? ' (' + v[2] + '건)' : ''); }"),
         ),
         legend_opts=opts.LegendOpts(pos_top="4%"),
     )
     st_pyecharts(chart, height="520px")
 
+DASHBOARD_SECTIONS = ["기간별 추이", "실거래 내역 리스트"]
+
+@st.fragment
+def render_trend_section(metric_df, current_type, result_digest, cube_cells=None):
+    """기간별 추이 영역 (환산 추정·추이 차트·Polar Scatter, 영역 내 위젯 조작 시 이 영역만 재실행)"""
+    st.markdown('<div class="chart-card-title"><span class="material-icons-outlined" style="color:#ef4444;">trending_up</span>기간별 거래 추이</div>', unsafe_allow_html=True)
+    st.markdown('<div class="chart-sub">전월세/매매 지표와 거래건수를 함께 확인합니다.</div>', unsafe_allow_html=True)
+    if current_type == "전월세":
+        conv_method_label = st.radio(
+            "환산 추정 방식",
+            list(CONVERSION_METHODS.keys()),
+            horizontal=True,
+            key="conv_method",
+            help="Huber/Theil-Sen은 이상치 계약의 영향을 줄인 강건 추정입니다."
+        )
+        conv_method = CONVERSION_METHODS[conv_method_label]
+        estimate = estimate_deposit_monthly_equivalent(
+            metric_df,
+            rates=get_cached_conversion_rates(metric_df, result_digest, method=conv_method)
+        )
+        if estimate is not None:
+            monthly_per_1000 = estimate["monthly_per_1000"]
+            slope = float(estimate["slope"])
+            intercept = float(estimate["intercept"])
+            direction = "증가" if monthly_per_1000 >= 0 else "감소"
+            st.markdown(
+                f"""
+                <div style="border:1px solid #e2e8f0; border-radius:12px; background:#f8fafc; padding:0.75rem 0.9rem; margin:0.55rem 0 0.8rem 0; color:#334155; font-size:0.87rem;">
+                    추정 환산: <b>보증금 1,000만원</b> 변화 시 <b>월세 약 {abs(monthly_per_1000):,.1f}만원 {direction}</b>
+                    <span style="color:#64748b;">(현재 필터 기준 {conv_method_label} 선형 추정, 표본 {estimate['n']:,}건, R²={estimate['r2']:.2f})</span>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+            conv_tab1, conv_tab2 = st.tabs(["보증금 → 월세", "월세 → 보증금"])
+            with conv_tab1:
+                dep_input = st.number_input(
+                    "보증금 입력 (만원)",
+                    min_value=0.0,
+                    value=80000.0,
+                    step=1000.0,
+                    key="conv_dep_input"
+                )
+                est_monthly = intercept + slope * dep_input
+                st.markdown(
+                    f"<div style='border:1px solid #e2e8f0; border-radius:10px; background:#ffffff; padding:0.7rem 0.85rem; color:#334155; font-size:0.87rem;'>추정 월세: <b>{est_monthly:,.1f}만원</b></div>",
+                    unsafe_allow_html=True
+                )
+
+            with conv_tab2:
+                rent_input = st.number_input(
+                    "월세 입력 (만원)",
+                    min_value=0.0,
+                    value=200.0,
+                    step=10.0,
+                    key="conv_rent_input"
+                )
+                if abs(slope) < 1e-9:
+                    st.markdown(
+                        "<div style='border:1px solid #e2e8f0; border-radius:10px; background:#ffffff; padding:0.7rem 0.85rem; color:#64748b; font-size:0.86rem;'>기울기가 0에 가까워 보증금 역산이 어렵습니다.</div>",
+                        unsafe_allow_html=True
+                    )
+                else:
+                    est_deposit = (rent_input - intercept) / slope
+                    st.markdown(
+                        f"<div style='border:1px solid #e2e8f0; border-radius:10px; background:#ffffff; padding:0.7rem 0.85rem; color:#334155; font-size:0.87rem;'>추정 보증금: <b>{est_deposit:,.0f}만원</b></div>",
+                        unsafe_allow_html=True
+                    )
+
+            with st.expander("세그먼트별 환산율", expanded=False):
+                segment_label = st.selectbox("구분 기준", list(CONVERSION_SEGMENTS.keys()), key="conv_segment")
+                segment_rates = get_cached_conversion_rates(
+                    metric_df, result_digest, segment_col=CONVERSION_SEGMENTS[segment_label], method=conv_method
+                )
+                if segment_rates.empty:
+                    st.caption(f"표본 {CONVERSION_MIN_SAMPLES}건 이상인 {segment_label}이(가) 없습니다.")
+                else:
+                    st.dataframe(
+                        segment_rates[["segment", "n", "monthly_per_1000", "r2"]]
+                        .sort_values("n", ascending=False, kind="stable")
+                        .rename(columns={
+                            "segment": segment_label,
+                            "n": "표본(건)",
+                            "monthly_per_1000": "1,000만원당 월세(만원)",
+                            "r2": "R²",
+                        })
+                        .round({"1,000만원당 월세(만원)": 2, "R²": 3}),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+        else:
+            st.markdown(
+                "<div style='border:1px solid #e2e8f0; border-radius:12px; background:#f8fafc; padding:0.75rem 0.9rem; margin:0.55rem 0 0.8rem 0; color:#64748b; font-size:0.85rem;'>환산 추정값을 계산하기 위한 전월세 데이터가 부족합니다.</div>",
+                unsafe_allow_html=True
+            )
+    render_trade_type_chart(metric_df, current_type, cache_key=result_digest, cells=cube_cells)
+    if current_type == "전월세":
+        st.markdown('<div class="chart-card-title" style="font-size:1.15rem; margin-top:0.9rem;"><span class="material-icons-outlined" style="color:#0ea5e9;">scatter_plot</span>보증금-월세 Polar Scatter</div>', unsafe_allow_html=True)
+        render_rental_polar_scatter(metric_df)
+
+@st.fragment
+def render_deal_list_section(disp_df, result_digest):
+    """실거래 내역 리스트 영역 (표·내보내기, 페이지/정렬/형식 변경 시 이 영역만 재실행)"""
+    # 최종 리스트 출력
+    st.markdown('<div class="chart-card-title" style="font-size:1.15rem;"><span class="material-icons-outlined" style="color:#0ea5e9;">table_chart</span>실거래 내역 리스트</div>', unsafe_allow_html=True)
+    render_awesome_table(
+        disp_df,
+        cache_key=(result_digest, tuple(disp_df.columns)),
+        key_prefix=f"deal_table_{st.session_state.df_nonce}"
+    )
+
+    # 다운로드 버튼 (파일은 클릭 시점에만 생성)
+    export_col, download_col = st.columns([1, 3])
+    with export_col:
+        export_format = st.selectbox(
+            "내보내기 형식",
+            list(EXPORT_FORMATS.keys()),
+            key="export_format",
+            label_visibility="collapsed",
+            help="Parquet/Arrow는 컬럼 타입(범주형·정수·날짜)을 유지해 노트북에서 바로 읽을 수 있습니다."
+        )
+    export_ext, export_mime, export_writer = EXPORT_FORMATS[export_format]
+    with download_col:
+        st.download_button(
+            f"📥 Result {export_format} Download",
+            data=lambda: export_writer(disp_df),
+            file_name=f"result_{datetime.datetime.now().strftime('%Y%m%d')}.{export_ext}",
+            mime=export_mime,
+            use_container_width=True
+        )
+
 # --- 사이드바 ---
 with st.sidebar:
     st.markdown('<div class="sidebar-brand"><span class="material-icons-outlined" style="color:#0ea5e9;">analytics</span>Search Portal</div>', unsafe_allow_html=True)
     st.markdown('<div class="sidebar-sub">실거래가 데이터 조회 시스템</div>', unsafe_allow_html=True)
     
-    if not SECRET_KEY:
+    if not requires_service_key():
+        st.info(f"모의 데이터 소스 사용 중 ({get_data_source_name()}): 공공데이터포털 API를 호출하지 않습니다.")
+        current_key = SECRET_KEY or get_data_source_name()
+    elif not SECRET_KEY:
         current_key = st.text_input("API 인증키", type="password", help="공공데이터포털 API 키")
     else:
         st.markdown('<div class="sidebar-api-ok"><span class="material-icons-outlined">check_circle</span>API 키가 설정되어 있습니다.</div>', unsafe_allow_html=True)
@@ -1372,7 +1258,17 @@ with st.sidebar:
                          horizontal=True, key="trade_type_radio")
     st.session_state.trade_type_val = trade_type
     
-    region_input = st.text_input("지역명 (시군구)", value="송파구", key="region_input_text")
+    region_input = st.text_input(
+        "지역명 (시군구)",
+        value="송파구",
+        key="region_input_text",
+        help="쉼표로 여러 지역을 함께 조회할 수 있습니다. 시도명을 입력하면 소속 시군구 전체를 조회합니다. 예시: 강남구, 서초구, 송파구 / 서울특별시"
+    )
+    region_index_error = load_region_index()["error"]
+    if region_index_error:
+        st.error(f"법정동 데이터를 불러올 수 없습니다: {region_index_error}")
+    for note in describe_region_ambiguity(region_input):
+        st.caption(note)
     
     today = datetime.date.today()
     try:
@@ -1395,6 +1291,20 @@ with st.sidebar:
         placeholder="예) 래미안&잠실 | 힐스테이트 -리센츠"
     )
     
+    incremental_refresh = st.checkbox(
+        "증분 갱신",
+        value=True,
+        key="incremental_refresh",
+        help="같은 지역·거래 유형을 다시 조회하면 새로 추가된 월과 최근 월만 다시 받아 기존 데이터에 반영합니다."
+    )
+    
+    stream_preview = st.checkbox(
+        "수집 중 미리보기",
+        value=True,
+        key="stream_preview",
+        help="월별 데이터가 도착하는 대로 진행률과 잠정 지표·월별 거래 건수를 먼저 보여줍니다."
+    )
+    
     st.divider()
     run_query = st.button("데이터 조회 실행", type="primary", use_container_width=True)
 
@@ -1415,38 +1325,79 @@ if run_query:
         st.error("❗ 서비스키가 설정되지 않았습니다. Secrets 설정 혹은 수동 입력을 확인하세요.")
     else:
         with st.spinner(f"⚡ {trade_type} 데이터 수집 중..."):
-            sigungu_code, full_region_name = get_region_code(region_input)
-            
-            if not sigungu_code:
+            regions, unresolved_regions = resolve_region_codes(region_input)
+            full_region_name = summarize_region_names(regions)
+            if unresolved_regions and regions:
+                st.warning(f"⚠️ 찾을 수 없는 지역은 제외했습니다: {', '.join(unresolved_regions)}")
+
+            if not regions:
                 st.error(f"❌ '{region_input}' 지역을 찾을 수 없습니다.")
             else:
+                preview = None
+                refresh_jobs = None
                 try:
-                    api = TransactionPrice(current_key)
-                    df = api.get_data(
-                        property_type="아파트",
-                        trade_type=trade_type,
-                        sigungu_code=sigungu_code,
-                        start_year_month=start_ym,
-                        end_year_month=end_ym
-                    )
+                    codes = sorted(code for code, _ in regions)
+                    if incremental_refresh:
+                        refresh_jobs = plan_incremental_refresh(
+                            st.session_state.df_source, regions, trade_type, start_ym, end_ym
+                        )
+
+                    total_jobs = len(refresh_jobs) if refresh_jobs is not None else len(build_fetch_jobs(codes, start_ym, end_ym))
+                    preview = StreamingPreview(trade_type, total_jobs) if stream_preview else None
+                    on_batch = preview.update if preview is not None else None
+
+                    if refresh_jobs is not None:
+                        # 이미 불러온 데이터를 기준으로 누락/최근 월만 다시 받아 병합
+                        fresh_df = pd.DataFrame()
+                        if refresh_jobs:
+                            fresh_df = build_transaction_dataset(
+                                fetch_transactions(
+                                    current_key, regions, trade_type, start_ym, end_ym,
+                                    jobs=refresh_jobs, on_batch=on_batch
+                                )
+                            )
+                        base_df = merge_incremental_refresh(
+                            st.session_state.base_df, fresh_df, regions, start_ym, end_ym
+                        )
+                        # 행이 돌아온 월만 수집 완료로 기록 (빈 응답 월은 다음 재조회 때 다시 요청)
+                        loaded = get_loaded_partitions(fresh_df, regions)
+                        partitions = {
+                            key: fetched_at
+                            for key, fetched_at in st.session_state.df_source["partitions"].items()
+                            if start_ym <= key.split(":")[1] <= end_ym
+                        }
+                        if loaded:
+                            st.toast(f"🔄 {len(loaded)}개 월 데이터를 새로 반영했습니다.")
+                    else:
+                        # 공유 데이터셋은 세션 간 재사용되므로 변경하지 않고 필터 결과만 새 프레임으로 생성
+                        # 데이터 소스·인증키가 다른 조회 결과는 섞이지 않도록 키에 포함 (인증키는 해시만 보관)
+                        key_id = hashlib.sha256(str(current_key).encode("utf-8")).hexdigest()[:24]
+                        query_key = (get_data_source_name(), key_id, tuple(codes), trade_type, start_ym, end_ym)
+                        base_df = get_shared_dataset_store().get_or_load(
+                            query_key,
+                            lambda: load_transaction_dataset(
+                                current_key, regions, trade_type, start_ym, end_ym, on_batch=on_batch
+                            )
+                        )
+                        partitions = {}
+                        loaded = get_loaded_partitions(base_df, regions)
+
+                    if preview is not None:
+                        preview.finish()
+
+                    fetched_at = time.time()
+                    partitions.update({key: fetched_at for key in loaded})
+                    st.session_state.base_df = base_df
+                    st.session_state.df_source = {"codes": codes, "trade_type": trade_type, "partitions": partitions}
                     
+                    df = base_df
                     if df is not None and not df.empty:
-                        df = standardize_columns(df)
-                        
-                        target_cols = ['매매가', '보증금', '월세', '전용면적', '층']
-                        for col in target_cols:
-                            if col in df.columns:
-                                df[f'{col}_num'] = df[col].apply(to_numeric_safe)
-                        
                         if apt_keyword and '아파트' in df.columns:
-                            df = apply_apt_keyword_filter(df, apt_keyword)
-                        
-                        sort_cols = [c for c in ['년', '월', '일'] if c in df.columns]
-                        if sort_cols:
-                            df = df.sort_values(by=sort_cols, ascending=False).reset_index(drop=True)
+                            df = apply_apt_keyword_filter(df, apt_keyword).reset_index(drop=True)
                         
                         st.session_state.df = df
                         st.session_state.df_nonce += 1
+                        st.session_state.df_meta = None
                         st.session_state.region_name = full_region_name
                         st.session_state.trade_type_val = trade_type
                         
@@ -1456,12 +1407,22 @@ if run_query:
                         st.warning(f"⚠️ {full_region_name} 데이터가 없습니다.")
                         
                 except Exception as e:
-                    st.error(f"❌ API 오류: {e}")
-                    st.session_state.df = None
+                    if preview is not None:
+                        preview.finish()
+                    if refresh_jobs is not None:
+                        # 재조회 실패 시 이미 불러온 월 데이터와 수집 기록은 그대로 유지
+                        st.error(f"❌ API 오류: {e} (기존 데이터를 유지합니다)")
+                    else:
+                        st.error(f"❌ API 오류: {e}")
+                        st.session_state.df = None
+                        st.session_state.base_df = None
+                        st.session_state.df_source = None
 
 # --- 메인 UI ---
 if st.session_state.df is not None:
-    raw_df = st.session_state.df.copy()
+    # 파생 컬럼은 조회 시점에 준비되므로 재실행마다 복사/재계산하지 않음
+    raw_df = st.session_state.df
+    dataset_meta = get_dataset_meta()
     current_type = st.session_state.trade_type_val
 
     # Hero Section
@@ -1473,17 +1434,22 @@ if st.session_state.df is not None:
     </div>
     """, unsafe_allow_html=True)
     
-    filtered_df = raw_df.copy()
+    filter_cache = get_filter_mask_cache()
+    quick_specs = []
     quick_filter_active_count = 0
     col_filter_active_count = 0
     filter_key_prefix = f"list_filter_{st.session_state.df_nonce}"
 
     # 가공용 컬럼 제거 후 리스트 전체 컬럼 필터를 적용
-    fixed_exclude = ['index', 'sggCd', 'umdNm', 'jibun', 'buildYear', 'aptSeq', 'umdCd', 'landCd', 'bonbun', 'bubun', 'cdealType', 'cdealDay', 'estateAgengSggNm', 'buerGbn']
-    road_exclude = [c for c in filtered_df.columns if str(c).startswith('road')]
-    internal_exclude = [c for c in filtered_df.columns if str(c).endswith('_num')]
-    all_drop_cols = list(set(fixed_exclude + road_exclude + internal_exclude))
-    actual_drop_cols = [c for c in all_drop_cols if c in filtered_df.columns]
+    fixed_exclude = ['index', '공급평형대', 'deal_date', 'period', 'sggCd', 'umdNm', 'jibun', 'buildYear', 'aptSeq', 'umdCd', 'landCd', 'bonbun', 'bubun', 'cdealType', 'cdealDay', 'estateAgengSggNm', 'buerGbn']
+    road_exclude = [c for c in raw_df.columns if str(c).startswith('road')]
+    display_labels = get_display_labels(raw_df)
+    internal_exclude = [c for c in raw_df.columns if str(c).endswith('_num') and c not in display_labels]
+    # 단일 지역 조회에서는 지역 태그 컬럼을 숨김
+    region_exclude = ['지역'] if '지역' in raw_df.columns and raw_df['지역'].nunique() <= 1 else []
+    all_drop_cols = list(set(fixed_exclude + road_exclude + internal_exclude + region_exclude))
+    actual_drop_cols = [c for c in all_drop_cols if c in raw_df.columns]
+    display_cols = [c for c in raw_df.columns if c not in actual_drop_cols]
 
     with st.expander("🎛️ Filter Studio", expanded=False):
         h1, h2 = st.columns([0.8, 0.2])
@@ -1499,8 +1465,8 @@ if st.session_state.df is not None:
         with tab_quick:
             c1, c2 = st.columns(2)
             if current_type == "매매":
-                if '매매가_num' in raw_df.columns:
-                    min_v, max_v = int(raw_df['매매가_num'].min()), int(raw_df['매매가_num'].max())
+                if '매매가_num' in dataset_meta["price_bounds"]:
+                    min_v, max_v = dataset_meta["price_bounds"]['매매가_num']
                     if min_v == max_v:
                         max_v += 1000
 
@@ -1512,11 +1478,11 @@ if st.session_state.df is not None:
                         st.session_state.filter_deal_price = deal_sel
                         if deal_sel[0] > min_v or deal_sel[1] < max_v:
                             quick_filter_active_count += 1
-                        filtered_df = filtered_df[filtered_df['매매가_num'].between(deal_sel[0], deal_sel[1])]
+                        quick_specs.append({"kind": "range", "col": '매매가_num', "low": deal_sel[0], "high": deal_sel[1]})
             else:
                 with c1:
-                    if '보증금_num' in raw_df.columns:
-                        min_v, max_v = int(raw_df['보증금_num'].min()), int(raw_df['보증금_num'].max())
+                    if '보증금_num' in dataset_meta["price_bounds"]:
+                        min_v, max_v = dataset_meta["price_bounds"]['보증금_num']
                         if min_v == max_v:
                             max_v += 100
 
@@ -1527,11 +1493,11 @@ if st.session_state.df is not None:
                         st.session_state.filter_dep_price = dep_sel
                         if dep_sel[0] > min_v or dep_sel[1] < max_v:
                             quick_filter_active_count += 1
-                        filtered_df = filtered_df[filtered_df['보증금_num'].between(dep_sel[0], dep_sel[1])]
+                        quick_specs.append({"kind": "range", "col": '보증금_num', "low": dep_sel[0], "high": dep_sel[1]})
 
                 with c2:
-                    if '월세_num' in raw_df.columns:
-                        min_v, max_v = int(raw_df['월세_num'].min()), int(raw_df['월세_num'].max())
+                    if '월세_num' in dataset_meta["price_bounds"]:
+                        min_v, max_v = dataset_meta["price_bounds"]['월세_num']
                         if min_v == max_v:
                             max_v += 10
 
@@ -1542,7 +1508,7 @@ if st.session_state.df is not None:
                         st.session_state.filter_rent_price = rent_sel
                         if rent_sel[0] > min_v or rent_sel[1] < max_v:
                             quick_filter_active_count += 1
-                        filtered_df = filtered_df[filtered_df['월세_num'].between(rent_sel[0], rent_sel[1])]
+                        quick_specs.append({"kind": "range", "col": '월세_num', "low": rent_sel[0], "high": rent_sel[1]})
 
             c3, c4 = st.columns(2)
             if '전용면적_num' in raw_df.columns:
@@ -1555,8 +1521,15 @@ if st.session_state.df is not None:
                     )
                     st.session_state.filter_area_unit = area_unit
 
+                    # 면적 옵션은 가격 조건을 통과한 행 기준으로 계산
+                    price_mask = compile_filter_mask(raw_df, quick_specs, filter_cache)
                     if area_unit == "공급면적(평형대)":
-                        area_series = filtered_df['전용면적_num'].apply(to_supply_pyeong_band)
+                        band_col = '공급평형대' if '공급평형대' in raw_df.columns else '전용면적_num'
+                        band_kind = "isin" if band_col == '공급평형대' else "area_band_isin"
+                        if band_col == '공급평형대':
+                            area_series = raw_df['공급평형대'][price_mask]
+                        else:
+                            area_series = to_supply_pyeong_band_series(raw_df['전용면적_num'][price_mask])
                         band_order = [label for _, label in SUPPLY_PYEONG_BANDS]
                         options = [b for b in band_order if b in area_series.dropna().unique().tolist()]
 
@@ -1570,9 +1543,9 @@ if st.session_state.df is not None:
                         st.session_state.filter_areas = []
                         if len(sel_bands) != len(options):
                             quick_filter_active_count += 1
-                        filtered_df = filtered_df[area_series.isin(sel_bands)]
+                        quick_specs.append({"kind": band_kind, "col": band_col, "values": sel_bands})
                     else:
-                        area_list = sorted(filtered_df['전용면적_num'].unique())
+                        area_list = np.unique(raw_df['전용면적_num'].to_numpy()[price_mask]).tolist()
                         default_areas = st.session_state.filter_areas if st.session_state.filter_areas else area_list
                         default_areas = [a for a in default_areas if a in area_list]
                         if not default_areas:
@@ -1583,10 +1556,10 @@ if st.session_state.df is not None:
                         st.session_state.filter_supply_bands = []
                         if len(sel_areas) != len(area_list):
                             quick_filter_active_count += 1
-                        filtered_df = filtered_df[filtered_df['전용면적_num'].isin(sel_areas)]
+                        quick_specs.append({"kind": "isin", "col": '전용면적_num', "values": sel_areas})
 
             if '층_num' in raw_df.columns:
-                floor_list = sorted(raw_df['층_num'].unique().astype(int))
+                floor_list = dataset_meta["floor_values"]
 
                 default_floors = st.session_state.filter_floors if st.session_state.filter_floors else floor_list
                 default_floors = [f for f in default_floors if f in floor_list]
@@ -1623,11 +1596,29 @@ if st.session_state.df is not None:
                     st.session_state.filter_floors = sel_floors
                     if len(sel_floors) != len(floor_list):
                         quick_filter_active_count += 1
-                    filtered_df = filtered_df[filtered_df['층_num'].isin(sel_floors)]
+                    quick_specs.append({"kind": "isin", "col": '층_num', "values": sel_floors})
 
-        disp_df_base = filtered_df.drop(columns=actual_drop_cols)
+        quick_mask = compile_filter_mask(raw_df, quick_specs, filter_cache)
         with tab_columns:
-            disp_df, col_filter_active_count = apply_all_column_filters(disp_df_base, key_prefix=filter_key_prefix)
+            col_specs, col_filter_active_count = build_column_filter_specs(
+                raw_df,
+                key_prefix=filter_key_prefix,
+                columns=display_cols,
+                base_mask=quick_mask,
+                labels=display_labels
+            )
+
+    # 빠른 필터/컬럼 필터 조건을 하나의 마스크로 결합한 뒤 결과 프레임은 한 번만 생성
+    final_mask = quick_mask & compile_filter_mask(raw_df, col_specs, filter_cache)
+    metric_df = raw_df[final_mask]
+    result_digest = mask_digest(final_mask)
+    disp_df = metric_df[display_cols].rename(columns=display_labels)
+
+    # 필터가 큐브 셀 경계(지역·단지·평형대·층구간)와 맞으면 KPI/차트를 행 대신 집계 셀로 계산
+    metric_cube = get_metric_cube()
+    cube_mask = cube_cell_mask(metric_cube, quick_specs + col_specs)
+    cube_cells = metric_cube["cells"][cube_mask] if cube_mask is not None else None
+    kpis = summarize_metric_cells(cube_cells) if cube_cells is not None else summarize_metric_rows(metric_df)
 
     st.markdown(
         f"""
@@ -1642,106 +1633,44 @@ if st.session_state.df is not None:
         unsafe_allow_html=True
     )
 
-    # 리스트 필터 결과 인덱스를 원본 필터 결과에 매핑해 지표도 동일 기준으로 계산
-    metric_df = filtered_df.loc[disp_df.index] if not disp_df.empty else filtered_df.iloc[0:0]
-
     # --- 핵심 지표 및 데이터 출력 ---
     if not metric_df.empty:
         m1, m2, m3, m4 = st.columns(4)
         with m1:
-            render_metric_card("총 거래", f"{len(metric_df):,}건", "현재 필터 결과", key="metric_total")
+            render_metric_card("총 거래", f"{kpis['count']:,}건", "현재 필터 결과", key="metric_total")
         
         if current_type == "매매":
             if '매매가_num' in metric_df.columns:
                 with m2:
-                    render_metric_card("평균 매매", f"{metric_df['매매가_num'].mean():,.0f}만", "거래 단가 평균", key="metric_avg_sale")
+                    render_metric_card("평균 매매", f"{kpis['mean']['매매가_num']:,.0f}만", "거래 단가 평균", key="metric_avg_sale")
                 with m3:
-                    render_metric_card("최고 매매", f"{metric_df['매매가_num'].max():,.0f}만", "최고 체결 금액", key="metric_max_sale")
+                    render_metric_card("최고 매매", f"{kpis['max']['매매가_num']:,.0f}만", "최고 체결 금액", key="metric_max_sale")
         else:
             if '보증금_num' in metric_df.columns:
                 with m2:
-                    render_metric_card("평균 보증금", f"{metric_df['보증금_num'].mean():,.0f}만", "보증금 평균", key="metric_avg_dep")
+                    render_metric_card("평균 보증금", f"{kpis['mean']['보증금_num']:,.0f}만", "보증금 평균", key="metric_avg_dep")
             if '월세_num' in metric_df.columns:
                 with m3:
-                    render_metric_card("평균 월세", f"{metric_df['월세_num'].mean():,.0f}만", "월세 평균", key="metric_avg_rent")
+                    render_metric_card("평균 월세", f"{kpis['mean']['월세_num']:,.0f}만", "월세 평균", key="metric_avg_rent")
         
         if '전용면적_num' in metric_df.columns:
             with m4:
-                render_metric_card("평균 면적", f"{metric_df['전용면적_num'].mean():,.1f}㎡", "전용면적 평균", key="metric_avg_area")
+                render_metric_card("평균 면적", f"{kpis['mean']['전용면적_num']:,.1f}㎡", "전용면적 평균", key="metric_avg_area")
         
         st.divider()
 
-        st.markdown('<div class="chart-card-title"><span class="material-icons-outlined" style="color:#ef4444;">trending_up</span>기간별 거래 추이</div>', unsafe_allow_html=True)
-        st.markdown('<div class="chart-sub">전월세/매매 지표와 거래건수를 함께 확인합니다.</div>', unsafe_allow_html=True)
-        if current_type == "전월세":
-            estimate = estimate_deposit_monthly_equivalent(metric_df)
-            if estimate is not None:
-                monthly_per_1000 = estimate["monthly_per_1000"]
-                slope = float(estimate["slope"])
-                intercept = float(estimate["intercept"])
-                direction = "증가" if monthly_per_1000 >= 0 else "감소"
-                st.markdown(
-                    f"""
-                    <div style="border:1px solid #e2e8f0; border-radius:12px; background:#f8fafc; padding:0.75rem 0.9rem; margin:0.55rem 0 0.8rem 0; color:#334155; font-size:0.87rem;">
-                        추정 환산: <b>보증금 1,000만원</b> 변화 시 <b>월세 약 {abs(monthly_per_1000):,.1f}만원 {direction}</b>
-                        <span style="color:#64748b;">(현재 필터 기준 선형 추정, 표본 {estimate['n']:,}건, R²={estimate['r2']:.2f})</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-                conv_tab1, conv_tab2 = st.tabs(["보증금 → 월세", "월세 → 보증금"])
-                with conv_tab1:
-                    dep_input = st.number_input(
-                        "보증금 입력 (만원)",
-                        min_value=0.0,
-                        value=80000.0,
-                        step=1000.0,
-                        key="conv_dep_input"
-                    )
-                    est_monthly = intercept + slope * dep_input
-                    st.markdown(
-                        f"<div style='border:1px solid #e2e8f0; border-radius:10px; background:#ffffff; padding:0.7rem 0.85rem; color:#334155; font-size:0.87rem;'>추정 월세: <b>{est_monthly:,.1f}만원</b></div>",
-                        unsafe_allow_html=True
-                    )
-
-                with conv_tab2:
-                    rent_input = st.number_input(
-                        "월세 입력 (만원)",
-                        min_value=0.0,
-                        value=200.0,
-                        step=10.0,
-                        key="conv_rent_input"
-                    )
-                    if abs(slope) < 1e-9:
-                        st.markdown(
-                            "<div style='border:1px solid #e2e8f0; border-radius:10px; background:#ffffff; padding:0.7rem 0.85rem; color:#64748b; font-size:0.86rem;'>기울기가 0에 가까워 보증금 역산이 어렵습니다.</div>",
-                            unsafe_allow_html=True
-                        )
-                    else:
-                        est_deposit = (rent_input - intercept) / slope
-                        st.markdown(
-                            f"<div style='border:1px solid #e2e8f0; border-radius:10px; background:#ffffff; padding:0.7rem 0.85rem; color:#334155; font-size:0.87rem;'>추정 보증금: <b>{est_deposit:,.0f}만원</b></div>",
-                            unsafe_allow_html=True
-                        )
-            else:
-                st.markdown(
-                    "<div style='border:1px solid #e2e8f0; border-radius:12px; background:#f8fafc; padding:0.75rem 0.9rem; margin:0.55rem 0 0.8rem 0; color:#64748b; font-size:0.85rem;'>환산 추정값을 계산하기 위한 전월세 데이터가 부족합니다.</div>",
-                    unsafe_allow_html=True
-                )
-        render_trade_type_chart(metric_df, current_type)
-        if current_type == "전월세":
-            st.markdown('<div class="chart-card-title" style="font-size:1.15rem; margin-top:0.9rem;"><span class="material-icons-outlined" style="color:#0ea5e9;">scatter_plot</span>보증금-월세 Polar Scatter</div>', unsafe_allow_html=True)
-            render_rental_polar_scatter(metric_df)
-        st.divider()
-        
-        # 최종 리스트 출력
-        st.markdown('<div class="chart-card-title" style="font-size:1.15rem;"><span class="material-icons-outlined" style="color:#0ea5e9;">table_chart</span>실거래 내역 리스트</div>', unsafe_allow_html=True)
-        render_awesome_table(disp_df)
-        
-        # 다운로드 버튼
-        csv = disp_df.to_csv(index=False).encode('utf-8-sig')
-        st.download_button("📥 Result CSV Download", data=csv, file_name=f"result_{datetime.datetime.now().strftime('%Y%m%d')}.csv", use_container_width=True)
+        # 무거운 영역(차트/리스트)은 선택된 것만 그리고, 영역 안의 위젯 조작은 해당 fragment만 다시 실행
+        section = st.radio(
+            "표시 영역",
+            DASHBOARD_SECTIONS,
+            horizontal=True,
+            key="dashboard_section",
+            label_visibility="collapsed"
+        )
+        if section == DASHBOARD_SECTIONS[0]:
+            render_trend_section(metric_df, current_type, result_digest, cube_cells)
+        else:
+            render_deal_list_section(disp_df, result_digest)
     else:
         st.warning("조회된 데이터가 없습니다. 필터 조건을 조정해 보세요.")
 else:
@@ -0,0 +1,86 @@
+"""월별 병렬 수집 벤치마크 (모의 데이터 소스로 동시성·디스크 캐시·재시도 동작 측정, API 키 불필요)
+
+사용 예:
+    python benchmarks/fetch_benchmark.py                              # 작업자 수 × 오류율 조합 측정
+    python benchmarks/fetch_benchmark.py --workers 1 6 --latency-ms 200
+    python benchmarks/fetch_benchmark.py --error-rates 0 0.2 --rate 0
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pipeline
+from pipeline import build_fetch_jobs, fetch_jobs_parallel
+from data_sources import MockTransactionPrice
+
+DEFAULT_CODES = ["11680", "11650", "11710"]
+DEFAULT_WORKERS = [1, 2, 4, 6, 8]
+DEFAULT_ERROR_RATES = [0.0, 0.1]
+
+def run_fetch(jobs, trade_type, workers, error_rate, args):
+    """모의 소스로 작업 목록을 한 번 수집하고 (소요 시간, 요청 수, 실패 여부) 반환"""
+    api = MockTransactionPrice(
+        latency_sec=args.latency_ms / 1000.0,
+        jitter_sec=args.jitter_ms / 1000.0,
+        error_rate=error_rate,
+        seed=args.seed,
+        rows_per_month=args.rows,
+    )
+    start = time.perf_counter()
+    failed = False
+    try:
+        fetch_jobs_parallel(None, trade_type, jobs, max_workers=workers, api=api)
+    except Exception:
+        failed = True
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(api._attempts.values()), failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모의 데이터 소스 병렬 수집 벤치마크")
+    parser.add_argument("--codes", nargs="+", default=DEFAULT_CODES, help="시군구 코드 목록")
+    parser.add_argument("--start", default="202301", help="시작 연월 (YYYYMM, 마감 월이어야 캐시 측정 가능)")
+    parser.add_argument("--end", default="202312", help="종료 연월 (YYYYMM)")
+    parser.add_argument("--trade-type", default="매매", choices=["매매", "전월세"])
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS, help="측정할 작업자 수 목록")
+    parser.add_argument("--error-rates", type=float, nargs="+", default=DEFAULT_ERROR_RATES, help="측정할 요청 실패 확률 목록")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="요청당 기본 지연")
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="요청당 추가 지연 상한")
+    parser.add_argument("--rate", type=float, default=pipeline.API_RATE_PER_SEC, help="호스트 초당 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--burst", type=int, default=pipeline.API_RATE_BURST, help="호스트 동시 시작 허용 요청 수")
+    parser.add_argument("--backoff", type=float, default=pipeline.FETCH_RETRY_BACKOFF_SEC, help="재시도 기본 대기(초)")
+    parser.add_argument("--rows", type=int, default=400, help="월별 합성 거래 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    jobs = build_fetch_jobs(args.codes, args.start, args.end)
+    pipeline.FETCH_RETRY_BACKOFF_SEC = args.backoff
+    pipeline.API_RATE_PER_SEC = args.rate
+    pipeline.API_RATE_BURST = args.burst
+    print(
+        f"작업 {len(jobs)}건 (지연 {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, "
+        f"초당 {args.rate:g}건·동시 {args.burst}건, 재시도 {pipeline.FETCH_MAX_RETRIES}회)"
+    )
+    print(f"  {'오류율':>6} {'작업자':>6} {'콜드(ms)':>10} {'요청':>6} {'재시도':>6} {'웜(ms)':>9} {'결과':>4}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for error_rate in args.error_rates:
+            for workers in args.workers:
+                # 조합마다 빈 캐시 디렉터리에서 시작해 콜드/웜 수집을 각각 측정
+                pipeline.TRANSACTION_CACHE_DIR = os.path.join(cache_dir, f"{error_rate}-{workers}")
+                cold, requests, failed = run_fetch(jobs, args.trade_type, workers, error_rate, args)
+                warm, warm_requests, _ = run_fetch(jobs, args.trade_type, workers, error_rate, args)
+                print(
+                    f"  {error_rate:>6.2f} {workers:>6} {cold * 1000:>10.1f} {requests:>6} "
+                    f"{requests - len(jobs):>6} {warm * 1000:>9.1f} {'실패' if failed else '성공':>4}"
+                    + (f"  (웜 요청 {warm_requests}건)" if warm_requests else "")
+                )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
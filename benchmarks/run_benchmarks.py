@@ -0,0 +1,180 @@
+"""데이터 준비·필터·집계 핫패스 벤치마크 (API 키 없이 합성 데이터로 실행)
+
+사용 예:
+    python benchmarks/run_benchmarks.py                   # 10k/100k/1M 측정 후 기준값과 비교
+    python benchmarks/run_benchmarks.py --sizes 10000     # 일부 크기만 측정
+    python benchmarks/run_benchmarks.py --update-baseline # 현재 결과를 기준값으로 저장
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+import pandas as pd
+
+from pipeline import (
+    standardize_columns,
+    to_numeric_series,
+    to_supply_pyeong_band_series,
+    compile_apt_keyword_expr,
+    apply_apt_keyword_filter,
+    compile_filter_mask,
+    search_table_rows,
+    sort_table_rows,
+    build_table_page_html,
+    make_period_frame,
+    prepare_dataset,
+    compact_transaction_frame,
+    build_transaction_dataset,
+    build_metric_cube,
+)
+from charts import HAS_PYECHARTS, build_trade_chart_options
+from synthetic_data import make_synthetic_transactions
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 1.25
+MIN_REGRESSION_SEC = 0.005
+KEYWORD_EXPR = "래미안&잠실 | 힐스테이트 -리센츠"
+TABLE_PAGE_SIZE = 50
+
+def time_call(func, repeat):
+    """repeat회 실행 중 최소 소요 시간(초) 반환 (func는 준비 작업을 제외한 측정값을 반환)"""
+    best = float("inf")
+    for _ in range(repeat):
+        elapsed = func()
+        best = min(best, elapsed)
+    return best
+
+def timed(func, *args, **kwargs):
+    """단일 호출 소요 시간(초)"""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def build_cases(raw):
+    """측정 항목 이름 → 1회 실행 후 소요 시간을 반환하는 함수"""
+    standardized = standardize_columns(raw.copy(deep=False))
+    prepared = prepare_dataset(standardize_columns(raw.copy()))
+    compacted = compact_transaction_frame(prepared.copy())
+    area_values = compacted["전용면적_num"].to_numpy(dtype=float)
+    price_values = compacted["매매가_num"]
+    low, high = np.percentile(price_values, [20, 80])
+    filter_specs = [
+        {"kind": "range", "col": "매매가_num", "low": float(low), "high": float(high)},
+        {"kind": "area_band_isin", "col": "전용면적_num", "values": ["24~26평형", "32~35평형"]},
+        {"kind": "int_isin", "col": "층_num", "values": list(range(5, 21))},
+        {"kind": "contains", "col": "아파트", "keyword": "잠실"},
+    ]
+
+    def keyword_case():
+        compile_apt_keyword_expr.cache_clear()
+        return timed(apply_apt_keyword_filter, compacted, KEYWORD_EXPR)
+
+    def table_case():
+        start = time.perf_counter()
+        positions = search_table_rows(compacted, "잠실")
+        positions = sort_table_rows(compacted, positions, "매매가_num", ascending=False)
+        build_table_page_html(compacted, positions[:TABLE_PAGE_SIZE])
+        return time.perf_counter() - start
+
+    cases = {
+        "standardize_columns": lambda: timed(standardize_columns, raw.copy(deep=False)),
+        "numeric_parsing": lambda: timed(to_numeric_series, standardized["매매가"]),
+        "band_mapping": lambda: timed(to_supply_pyeong_band_series, area_values),
+        "prepare_dataset": lambda: timed(prepare_dataset, standardized.copy(deep=False)),
+        "build_transaction_dataset": lambda: timed(build_transaction_dataset, raw.copy(deep=False)),
+        "apt_keyword_filter": keyword_case,
+        "make_period_frame": lambda: timed(make_period_frame, compacted),
+        "filter_mask": lambda: timed(compile_filter_mask, compacted, filter_specs),
+        "table_page": table_case,
+        "metric_cube": lambda: timed(build_metric_cube, compacted),
+    }
+    if HAS_PYECHARTS:
+        cases["chart_options"] = lambda: timed(
+            build_trade_chart_options, compacted, "매매", "매매가", "매매가_num", "매매가(만원)"
+        )
+    return cases
+
+def run_benchmarks(sizes, repeat):
+    """크기별로 합성 데이터를 만들어 각 항목의 최소 소요 시간 측정"""
+    results = {}
+    for size in sizes:
+        raw = make_synthetic_transactions(size, trade_type="매매", n_complexes=max(50, size // 300))
+        results[str(size)] = {}
+        for name, case in build_cases(raw).items():
+            results[str(size)][name] = round(time_call(case, repeat if size < 1_000_000 else max(1, repeat // 2)), 6)
+            print(f"  {size:>9,} rows  {name:<26} {results[str(size)][name] * 1000:>10.1f} ms", flush=True)
+    return results
+
+def compare_with_baseline(results, baseline, threshold):
+    """기준값 대비 threshold배 이상 느려진 항목 목록 [(크기, 항목, 현재, 기준)]"""
+    regressions = []
+    for size, cases in results.items():
+        base_cases = baseline.get("results", {}).get(size, {})
+        for name, elapsed in cases.items():
+            base = base_cases.get(name)
+            if base is None:
+                continue
+            if elapsed > base * threshold and elapsed - base > MIN_REGRESSION_SEC:
+                regressions.append((size, name, elapsed, base))
+    return regressions
+
+def environment_info():
+    """기준값과 함께 기록할 실행 환경"""
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실거래가 데이터 처리 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="측정할 행 수 목록")
+    parser.add_argument("--repeat", type=int, default=3, help="항목별 반복 횟수 (최솟값 기록)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀로 판단할 기준 대비 배율")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 경로")
+    parser.add_argument("--update-baseline", action="store_true", help="측정 결과를 기준값으로 저장")
+    args = parser.parse_args(argv)
+
+    print(f"벤치마크 실행: {', '.join(f'{s:,}' for s in args.sizes)}행")
+    results = run_benchmarks(args.sizes, args.repeat)
+
+    if args.update_baseline:
+        baseline = {"environment": environment_info(), "results": results}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("results", {})
+            baseline["results"] = {**previous, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("기준값 파일이 없어 비교를 생략합니다. --update-baseline으로 생성하세요.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if not regressions:
+        print(f"회귀 없음 (기준 대비 {args.threshold:.2f}배 이내)")
+        return 0
+
+    print(f"성능 회귀 {len(regressions)}건 (기준 대비 {args.threshold:.2f}배 초과):")
+    for size, name, elapsed, base in regressions:
+        print(f"  {int(size):>9,} rows  {name:<26} {base * 1000:>8.1f} ms → {elapsed * 1000:>8.1f} ms ({elapsed / base:.2f}x)")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
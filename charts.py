@@ -0,0 +1,495 @@
+"""차트 옵션/표본 추출 로직 (렌더링 없이 ECharts 옵션과 좌표만 생성)"""
+import math
+import json
+
+import numpy as np
+import pandas as pd
+
+from pipeline import make_period_frame, aggregate_metric_cells, rollup_metric_cells
+
+try:
+    from pyecharts import options as opts
+    from pyecharts.charts import Line, Bar
+    HAS_PYECHARTS = True
+except ModuleNotFoundError:
+    opts = None
+    Line = None
+    Bar = None
+    HAS_PYECHARTS = False
+
+TREND_CHART_DEFAULT_TOP_N = 10
+TREND_CHART_MAX_POINTS = 120
+TREND_OTHER_LABEL = "기타"
+
+def lttb_indices(values, threshold):
+    """Largest-Triangle-Three-Buckets 방식으로 형태를 유지할 표본 인덱스 선택 (처음/마지막 점 포함)"""
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    valid = ~np.isnan(y)
+    if not valid.any():
+        return np.unique(np.linspace(0, n - 1, threshold).round().astype(int))
+    if not valid.all():
+        # 결측 월은 선형 보간한 값으로 면적 계산
+        y = np.interp(np.arange(n), np.flatnonzero(valid), y[valid])
+
+    x = np.arange(n, dtype=float)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        next_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        if end < next_end:
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected.append(a)
+    selected.append(n - 1)
+    return np.asarray(selected)
+
+def fold_minor_series(labels, top_n, weights=None):
+    """거래량 상위 top_n개 라벨만 남기고 나머지는 '기타'로 합친 라벨 시리즈 반환 (weights: 라벨별 거래 건수, 동률은 이름순)"""
+    weights = pd.Series(1 if weights is None else weights, index=labels.index)
+    counts = weights.groupby(labels, sort=True).sum()
+    if len(counts) <= top_n:
+        return labels
+    top = counts.sort_values(ascending=False, kind='stable').index[:top_n]
+    return labels.where(labels.isin(top), TREND_OTHER_LABEL)
+
+def order_series_columns(columns):
+    """시리즈 순서를 이름순으로 두고 '기타'는 마지막에 배치"""
+    columns = list(columns)
+    return [c for c in columns if c != TREND_OTHER_LABEL] + [c for c in columns if c == TREND_OTHER_LABEL]
+
+def get_trade_chart_metric_options(df, trade_type):
+    """거래유형별 차트 지표 선택지 [(라벨, 값 컬럼, 축 이름)]"""
+    if trade_type == "전월세":
+        metric_options = []
+        if '보증금_num' in df.columns:
+            metric_options.append(("보증금", "보증금_num", "보증금(만원)"))
+        if '월세_num' in df.columns:
+            metric_options.append(("월세", "월세_num", "월세(만원)"))
+        if {'보증금_num', '월세_num'}.issubset(df.columns):
+            metric_options.append(("보증금+월세", "combined", "금액(만원)"))
+        return metric_options
+    if '매매가_num' in df.columns:
+        return [("매매가", "매매가_num", "매매가(만원)")]
+    return []
+
+TREND_DIM_COLS = ['지역', '아파트', 'period']
+TREND_VALUE_COLS = ['매매가_num', '보증금_num', '월세_num']
+
+def aggregate_trend_cells(df=None, cells=None):
+    """차트 입력을 (지역, 아파트, 거래월) 단위 건수·합계 셀로 축약 (큐브 셀이 있으면 행 대신 셀을 재집계)"""
+    if cells is not None:
+        dims = [c for c in TREND_DIM_COLS if c in cells.columns]
+        if 'period' not in dims or cells.empty:
+            return pd.DataFrame()
+        trend = rollup_metric_cells(cells[cells['period'].notna()], dims)
+    else:
+        base = make_period_frame(df)
+        if base.empty:
+            return pd.DataFrame()
+        dims = [c for c in TREND_DIM_COLS if c in base.columns]
+        trend = aggregate_metric_cells(base, dims, TREND_VALUE_COLS)
+    return trend if not trend.empty else pd.DataFrame()
+
+def build_trade_chart_options(df, trade_type, metric_choice, value_col, y_axis_name, top_n=TREND_CHART_DEFAULT_TOP_N, cells=None):
+    """기간-가격 상관 차트의 ECharts 옵션(dict) 생성 (단지 시리즈는 상위 top_n + 기타, 데이터 부족 시 None)"""
+    base = aggregate_trend_cells(df, cells)
+    if base.empty:
+        return None
+
+    def axis_bounds(values, pad_ratio=0.08, force_int=False):
+        vals = [float(v) for v in values if pd.notna(v)]
+        if not vals:
+            return 0, 1
+        v_min, v_max = min(vals), max(vals)
+        if v_min == v_max:
+            pad = max(abs(v_min) * 0.1, 1.0)
+            low, high = v_min - pad, v_max + pad
+        else:
+            span = v_max - v_min
+            pad = span * pad_ratio
+            low, high = max(0, v_min - pad), v_max + pad
+
+        if force_int:
+            low = int(math.floor(low))
+            high = int(math.ceil(high))
+            if low == high:
+                high = low + 1
+            return low, high
+
+        # 부동소수점 노이즈(예: 7.14800000002) 제거용 축값 정규화
+        max_abs = max(abs(low), abs(high))
+        if max_abs >= 1000:
+            digits = 0
+        elif max_abs >= 100:
+            digits = 1
+        elif max_abs >= 10:
+            digits = 1
+        elif max_abs >= 1:
+            digits = 2
+        else:
+            digits = 3
+
+        low = round(low, digits)
+        high = round(high, digits)
+        if low == high:
+            high = round(high + (10 ** (-digits)), digits)
+        return low, high
+
+    def build_avg_markline(avg_value, label, color):
+        if avg_value is None or pd.isna(avg_value):
+            return None
+        return opts.MarkLineOpts(
+            symbol=["none", "none"],
+            is_silent=True,
+            linestyle_opts=opts.LineStyleOpts(color=color, width=1.6, type_="dotted"),
+            label_opts=opts.LabelOpts(
+                is_show=True,
+                formatter=f"{label} 평균: {{c}}",
+                color=color,
+                font_size=11,
+            ),
+            data=[opts.MarkLineItem(name=f"{label} 평균", y=round(float(avg_value), 1))],
+        )
+
+    def calculate_regression_line(y_values):
+        """주어진 값들의 선형 회귀 추세선 값을 계산하여 반환"""
+        indices = [i for i, v in enumerate(y_values) if v is not None and not pd.isna(v)]
+        valid_vals = [float(y_values[i]) for i in indices]
+        
+        if len(indices) < 2:
+            return [None] * len(y_values)
+        
+        n = len(indices)
+        x_sum = sum(indices)
+        y_sum = sum(valid_vals)
+        xy_sum = sum(i * v for i, v in zip(indices, valid_vals))
+        x2_sum = sum(i * i for i in indices)
+        
+        denom = (n * x2_sum - x_sum**2)
+        if denom == 0:
+            return [None] * len(y_values)
+            
+        slope = (n * xy_sum - x_sum * y_sum) / denom
+        intercept = (y_sum - slope * x_sum) / n
+        
+        return [round(slope * i + intercept, 1) for i in range(len(y_values))]
+
+    apt_series = pd.Series(["전체"] * len(base), index=base.index)
+    if '아파트' in base.columns:
+        apt_series = base['아파트'].astype(str).replace("nan", "").replace("", "미상")
+        # 다지역 조회 시 동명 단지가 합쳐지지 않도록 시군구명을 함께 표기
+        if '지역' in base.columns and base['지역'].nunique() > 1:
+            apt_series = apt_series + " · " + base['지역'].astype(str).str.split().str[-1]
+    # 추세선은 전체 단지 기준으로 계산하고, 라인/막대 시리즈만 상위 단지 + 기타로 축약
+    base = base.assign(_apt_all=apt_series, _apt=fold_minor_series(apt_series, top_n, weights=base['n']))
+    apt_names = [n for n in sorted(base['_apt'].dropna().unique().tolist()) if str(n).strip() != ""]
+    multi_apt = len(apt_names) >= 2
+
+    monthly_cnt = (
+        base.groupby('period', as_index=False)
+        .agg(거래건수=('n', 'sum'))
+        .sort_values('period')
+    )
+    full_x_data = monthly_cnt['period'].tolist()
+
+    def cell_mean(frame, col):
+        # 셀 합계/건수로 평균 계산 (값이 없는 그룹은 NaN)
+        return frame[f'{col}_sum'] / frame[f'{col}_cnt'].where(frame[f'{col}_cnt'] > 0)
+
+    def apt_mean_pivot(col, apt_col='_apt', index=None):
+        grouped = base.groupby(['period', apt_col], as_index=False)[[f'{col}_sum', f'{col}_cnt']].sum()
+        return (
+            grouped.assign(value=cell_mean(grouped, col))
+            .pivot(index='period', columns=apt_col, values='value')
+            .reindex(index if index is not None else full_x_data)
+        )
+
+    def overall_mean(col):
+        if f'{col}_cnt' not in base.columns:
+            return np.nan
+        count = base[f'{col}_cnt'].sum()
+        return base[f'{col}_sum'].sum() / count if count else np.nan
+
+    def trend_values(col):
+        # 전체 월 기준 회귀 후 표시 월만 추출
+        trend = calculate_regression_line(apt_mean_pivot(col, '_apt_all').mean(axis=1).tolist())
+        return [trend[i] for i in keep_idx]
+
+    keep_idx = np.arange(len(full_x_data))
+    if len(full_x_data) > TREND_CHART_MAX_POINTS:
+        shape_col = '보증금_num' if value_col == "combined" else value_col
+        shape_sums = base.groupby('period')[[f'{shape_col}_sum', f'{shape_col}_cnt']].sum()
+        shape_values = cell_mean(shape_sums, shape_col).reindex(full_x_data).to_numpy()
+        keep_idx = lttb_indices(shape_values, TREND_CHART_MAX_POINTS)
+    x_data = [full_x_data[i] for i in keep_idx]
+    cnt_month = monthly_cnt['거래건수'].iloc[keep_idx].tolist()
+    cnt_min, cnt_max = axis_bounds(cnt_month, 0.2, force_int=True)
+
+    all_values = []
+    dep_values_all = []
+    rent_values_all = []
+    combined_dual_axis = trade_type == "전월세" and metric_choice == "보증금+월세"
+    dep_avg_markline = None
+    rent_avg_markline = None
+    single_avg_markline = None
+
+    if combined_dual_axis:
+        dep_avg = overall_mean('보증금_num')
+        rent_avg = overall_mean('월세_num')
+        dep_avg_markline = build_avg_markline(dep_avg, "보증금", "#0369a1")
+        rent_avg_markline = build_avg_markline(rent_avg, "월세", "#c2410c")
+    else:
+        single_avg = overall_mean(value_col)
+        single_avg_markline = build_avg_markline(single_avg, metric_choice, "#0f766e")
+
+    line = Line()
+    line.add_xaxis(x_data)
+    if combined_dual_axis:
+        dep_pivot = apt_mean_pivot('보증금_num', index=x_data)
+        rent_pivot = apt_mean_pivot('월세_num', index=x_data)
+
+        for apt in order_series_columns(dep_pivot.columns):
+            dep_values = dep_pivot[apt].round(1).tolist()
+            dep_values_all.extend([v for v in dep_values if pd.notna(v)])
+            all_values.extend([v for v in dep_values if pd.notna(v)])
+            dep_line_values = [None if pd.isna(v) else float(v) for v in dep_values]
+            line.add_yaxis(
+                f"{apt} 보증금",
+                dep_line_values,
+                yaxis_index=0,
+                is_smooth=True,
+                symbol="none",
+                is_connect_nones=True,
+                label_opts=opts.LabelOpts(is_show=False),
+                linestyle_opts=opts.LineStyleOpts(width=2.4, type_="solid"),
+                markline_opts=dep_avg_markline,
+            )
+
+        for apt in order_series_columns(rent_pivot.columns):
+            rent_values = rent_pivot[apt].round(1).tolist()
+            rent_values_all.extend([v for v in rent_values if pd.notna(v)])
+            all_values.extend([v for v in rent_values if pd.notna(v)])
+            rent_line_values = [None if pd.isna(v) else float(v) for v in rent_values]
+            line.add_yaxis(
+                f"{apt} 월세",
+                rent_line_values,
+                yaxis_index=1,
+                is_smooth=True,
+                symbol="none",
+                is_connect_nones=True,
+                label_opts=opts.LabelOpts(is_show=False),
+                linestyle_opts=opts.LineStyleOpts(width=2.0, type_="dashed"),
+                markline_opts=rent_avg_markline,
+            )
+
+        # 추세선 추가
+        dep_trend = trend_values('보증금_num')
+        line.add_yaxis(
+            "보증금 추세선",
+            dep_trend,
+            yaxis_index=0,
+            is_smooth=True,
+            symbol="none",
+            is_connect_nones=True,
+            label_opts=opts.LabelOpts(is_show=False),
+            linestyle_opts=opts.LineStyleOpts(width=2.8, type_="dotted", color="#0369a1"),
+            itemstyle_opts=opts.ItemStyleOpts(color="#0369a1"),
+        )
+
+        rent_trend = trend_values('월세_num')
+        line.add_yaxis(
+            "월세 추세선",
+            rent_trend,
+            yaxis_index=1,
+            is_smooth=True,
+            symbol="none",
+            is_connect_nones=True,
+            label_opts=opts.LabelOpts(is_show=False),
+            linestyle_opts=opts.LineStyleOpts(width=2.5, type_="dotted", color="#c2410c"),
+            itemstyle_opts=opts.ItemStyleOpts(color="#c2410c"),
+        )
+    else:
+        pivot = apt_mean_pivot(value_col, index=x_data)
+
+        for apt in order_series_columns(pivot.columns):
+            values = pivot[apt].round(1).tolist()
+            all_values.extend([v for v in values if pd.notna(v)])
+            line_values = [None if pd.isna(v) else float(v) for v in values]
+            line.add_yaxis(
+                f"{apt}",
+                line_values,
+                is_smooth=True,
+                symbol="none",
+                is_connect_nones=True,
+                label_opts=opts.LabelOpts(is_show=False),
+                linestyle_opts=opts.LineStyleOpts(width=2.4, type_="solid"),
+                markline_opts=single_avg_markline,
+            )
+
+        # 추세선 추가
+        trend = trend_values(value_col)
+        trend_label = f"{metric_choice} 추세선"
+        trend_color = "#ef4444" if trade_type == "매매" else "#0f766e"
+        line.add_yaxis(
+            trend_label,
+            trend,
+            is_smooth=True,
+            symbol="none",
+            is_connect_nones=True,
+            label_opts=opts.LabelOpts(is_show=False),
+            linestyle_opts=opts.LineStyleOpts(width=2.8, type_="dotted", color=trend_color),
+            itemstyle_opts=opts.ItemStyleOpts(color=trend_color),
+        )
+
+    val_min, val_max = axis_bounds(all_values, 0.12)
+
+    cnt_axis_index = 1
+    if combined_dual_axis:
+        rent_min, rent_max = axis_bounds(rent_values_all, 0.12)
+        dep_min, dep_max = axis_bounds(dep_values_all, 0.12)
+        line.extend_axis(
+            yaxis=opts.AxisOpts(
+                name="월세(만원)",
+                type_="value",
+                position="right",
+                min_=rent_min,
+                max_=rent_max,
+                axislabel_opts=opts.LabelOpts(formatter="{value}"),
+            )
+        )
+        cnt_axis_index = 2
+    else:
+        dep_min, dep_max = val_min, val_max
+
+    line.extend_axis(
+        yaxis=opts.AxisOpts(
+            name="거래건수(건)",
+            type_="value",
+            position="right",
+            offset=56 if combined_dual_axis else 0,
+            min_=cnt_min,
+            max_=cnt_max,
+            axislabel_opts=opts.LabelOpts(formatter="{value}"),
+        )
+    )
+
+    bar = Bar()
+    bar.add_xaxis(x_data)
+    if multi_apt:
+        cnt_by_apt = (
+            base.groupby(['period', '_apt'], as_index=False)
+            .agg(cnt=('n', 'sum'))
+            .pivot(index='period', columns='_apt', values='cnt')
+            .reindex(x_data)
+            .fillna(0)
+        )
+        for apt in order_series_columns(cnt_by_apt.columns):
+            bar.add_yaxis(
+                f"{apt} 거래건수",
+                cnt_by_apt[apt].astype(int).tolist(),
+                yaxis_index=cnt_axis_index,
+                stack="apt_cnt",
+                bar_width="60%",
+                category_gap="78%",
+                label_opts=opts.LabelOpts(is_show=False),
+                itemstyle_opts=opts.ItemStyleOpts(opacity=0.28),
+            )
+    else:
+        bar.add_yaxis(
+            "월별 거래건수",
+            cnt_month,
+            yaxis_index=cnt_axis_index,
+            bar_width="60%",
+            category_gap="78%",
+            label_opts=opts.LabelOpts(is_show=False),
+            itemstyle_opts=opts.ItemStyleOpts(color="rgba(148, 163, 184, 0.20)"),
+        )
+
+    line.overlap(bar)
+    title = f"월평균 추세 + 월별 거래건수 ({'전월세' if trade_type == '전월세' else '매매'})"
+    if TREND_OTHER_LABEL in apt_names and base['_apt_all'].nunique() > top_n:
+        series_note = f"거래량 상위 {top_n}개 단지 + {TREND_OTHER_LABEL}"
+    else:
+        series_note = '아파트별 라인' if multi_apt else '단일 라인'
+    if len(x_data) < len(full_x_data):
+        series_note += f" · {len(full_x_data)}개월 중 {len(x_data)}개월 표본"
+    subtitle = f"지표: {metric_choice} · {series_note} · 평균 가이드 및 추세선 포함"
+    line.set_global_opts(
+        title_opts=opts.TitleOpts(title=title, subtitle=subtitle),
+        tooltip_opts=opts.TooltipOpts(trigger="axis"),
+        legend_opts=opts.LegendOpts(pos_top="4%", type_="scroll"),
+        xaxis_opts=opts.AxisOpts(type_="category", boundary_gap=False),
+        yaxis_opts=opts.AxisOpts(
+            name="보증금(만원)" if combined_dual_axis else y_axis_name,
+            type_="value",
+            min_=dep_min,
+            max_=dep_max,
+        ),
+        datazoom_opts=[
+            opts.DataZoomOpts(type_="inside", range_start=0, range_end=100),
+            opts.DataZoomOpts(type_="slider", range_start=0, range_end=100)
+        ],
+    )
+    return json.loads(line.dump_options())
+
+POLAR_SAMPLE_STRATA = 20
+POLAR_SAMPLE_SEED = 0
+
+def grid_cell_ids(deposits, rents, bins):
+    """보증금·월세 값을 bins x bins 격자 셀 번호로 변환"""
+    def bucket(values):
+        low, high = values.min(), values.max()
+        if high <= low:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - low) / (high - low) * bins).astype(np.int64), bins - 1)
+    return bucket(deposits) * bins + bucket(rents)
+
+def bin_polar_points(deposits, rents, budget):
+    """격자 셀 단위로 점을 합쳐 (평균 보증금, 평균 월세, 건수) 반환 (셀 수는 budget 이하)"""
+    bins = max(1, int(math.isqrt(int(budget))))
+    cells = grid_cell_ids(deposits, rents, bins)
+    grouped = (
+        pd.DataFrame({"cell": cells, "dep": deposits, "rent": rents})
+        .groupby("cell", sort=True)
+        .agg(dep=("dep", "mean"), rent=("rent", "mean"), count=("dep", "size"))
+    )
+    return grouped.reset_index(drop=True)
+
+def largest_remainder_quota(weights, total):
+    """정수 total을 weights 비율로 나눈 몫 (내림 후 남는 수는 소수부가 큰 순서로 1씩 배정, 합은 정확히 total)"""
+    exact = weights * (total / weights.sum())
+    quota = np.floor(exact).astype(np.int64)
+    short = int(total - quota.sum())
+    if short > 0:
+        quota[np.argsort(quota - exact, kind="stable")[:short]] += 1
+    return quota
+
+def stratified_sample_positions(deposits, rents, budget, strata=POLAR_SAMPLE_STRATA, seed=POLAR_SAMPLE_SEED):
+    """격자 셀을 층으로 삼아 셀 크기에 비례하도록 결정적 표본 위치 선택 (총 budget점, 예산이 허락하면 희소 셀도 1점 유지)"""
+    n = len(deposits)
+    if n <= budget:
+        return np.arange(n)
+    cells = grid_cell_ids(deposits, rents, strata)
+    rank = np.random.default_rng(seed).permutation(n)
+    order = np.lexsort((rank, cells))
+    sorted_cells = cells[order]
+    _, starts, counts = np.unique(sorted_cells, return_index=True, return_counts=True)
+    if len(counts) <= budget:
+        # 셀마다 1점을 먼저 주고 남은 예산을 나머지 행 수에 비례해 배분
+        quota = 1 + largest_remainder_quota(counts - 1, budget - len(counts))
+    else:
+        quota = np.zeros(len(counts), dtype=np.int64)
+        quota[np.argsort(-counts, kind="stable")[:budget]] = 1
+    quota = np.minimum(quota, counts)
+    position_in_cell = np.arange(n) - np.repeat(starts, counts)
+    keep = position_in_cell < np.repeat(quota, counts)
+    return np.sort(order[keep])
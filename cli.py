@@ -0,0 +1,152 @@
+"""실거래가 배치 수집 CLI (브라우저 없이 수집 → 정제 → 파티션 Parquet + 요약 집계 저장)
+
+사용 예:
+    REMON_SERVICE_KEY=... python cli.py --regions 서울특별시 --start 202401 --end 202412
+    python cli.py --regions 강남구,서초구 --trade-type 전월세 --start 202406 --end 202412 --workers 8 --out snapshots
+    REMON_DATA_SOURCE=mock python cli.py --regions 송파구 --start 202401 --end 202403   # API 키 없이 모의 소스로 실행
+
+출력 구조 ({out}/{sale|rent}/):
+    transactions/sigungu_code=XXXXX/year_month=YYYYMM/part-0.parquet
+    summary_monthly.parquet      지역·거래월별 건수/가격 통계
+    conversion_rates.parquet     (전월세) 지역별 보증금→월세 환산율
+    manifest.json                실행 조건과 결과 요약
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+import pyarrow.parquet as pq
+
+from pipeline import (
+    TRADE_TYPE_SLUGS,
+    load_region_index,
+    resolve_region_codes,
+    build_fetch_jobs,
+    load_transaction_dataset,
+    apply_apt_keyword_filter,
+    build_monthly_summary,
+    estimate_conversion_rates,
+)
+from data_sources import get_data_source_name, requires_service_key
+from exports import to_export_table
+
+SERVICE_KEY_ENV = "REMON_SERVICE_KEY"
+PARTITION_COLS = ["sigungu_code", "year_month"]
+
+def add_partition_columns(df, regions):
+    """지역명 → 시군구코드, 거래월(period) → YYYYMM 파티션 컬럼 추가 (알 수 없는 값은 unknown)"""
+    name_to_code = {name: code for code, name in regions}
+    df["sigungu_code"] = df["지역"].astype(object).map(name_to_code).fillna("unknown").astype(str)
+    df["year_month"] = df["period"].astype(object).str.replace("-", "", regex=False).fillna("unknown").astype(str)
+    return df
+
+def write_partitioned_dataset(df, root_dir):
+    """시군구·거래월 파티션 Parquet 데이터셋 저장 (같은 파티션의 이전 스냅샷은 교체)"""
+    pq.write_to_dataset(
+        to_export_table(df),
+        root_dir,
+        partition_cols=PARTITION_COLS,
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실거래가 배치 수집·스냅샷 생성")
+    parser.add_argument("--regions", required=True, help="쉼표로 구분한 시군구/시도명 (예: 강남구,서초구 또는 서울특별시)")
+    parser.add_argument("--start", required=True, help="시작 연월 (YYYYMM)")
+    parser.add_argument("--end", required=True, help="종료 연월 (YYYYMM)")
+    parser.add_argument("--trade-type", default="매매", choices=list(TRADE_TYPE_SLUGS.keys()))
+    parser.add_argument("--workers", type=int, default=None, help="병렬 수집 작업자 수 (기본: 앱과 동일)")
+    parser.add_argument("--keyword", default="", help="아파트명 조건식 (예: 래미안&잠실 | 힐스테이트 -리센츠)")
+    parser.add_argument("--conversion-method", default="ols", choices=["ols", "huber", "theil_sen"], help="전월세 환산율 추정 방식")
+    parser.add_argument("--out", default="snapshots", help="출력 디렉터리")
+    parser.add_argument("--service-key", default=os.environ.get(SERVICE_KEY_ENV), help=f"공공데이터포털 API 키 (기본: ${SERVICE_KEY_ENV})")
+    args = parser.parse_args(argv)
+
+    for label, value in (("--start", args.start), ("--end", args.end)):
+        if len(value) != 6 or not value.isdigit():
+            parser.error(f"{label}는 YYYYMM 형식이어야 합니다: {value}")
+    if args.start > args.end:
+        parser.error("--start가 --end보다 늦습니다.")
+    if requires_service_key() and not args.service_key:
+        parser.error(f"서비스키가 없습니다. --service-key 또는 ${SERVICE_KEY_ENV}를 설정하세요.")
+
+    region_index_error = load_region_index()["error"]
+    if region_index_error:
+        log(f"법정동 데이터를 불러올 수 없습니다: {region_index_error}")
+        return 1
+    regions, unresolved = resolve_region_codes(args.regions)
+    if unresolved:
+        log(f"지역코드를 찾지 못한 지역: {', '.join(unresolved)}")
+    if not regions:
+        log("조회할 지역이 없습니다.")
+        return 1
+
+    jobs_total = len(build_fetch_jobs([code for code, _ in regions], args.start, args.end))
+    log(f"{args.trade_type} 수집: {len(regions)}개 지역 × {jobs_total // len(regions)}개월 = {jobs_total}건 ({get_data_source_name()})")
+    done = 0
+
+    def on_batch(job, frame):
+        nonlocal done
+        done += 1
+        if done % 25 == 0 or done == jobs_total:
+            log(f"  {done}/{jobs_total} 완료")
+
+    started = time.time()
+    try:
+        df = load_transaction_dataset(
+            args.service_key, regions, args.trade_type, args.start, args.end,
+            on_batch=on_batch, max_workers=args.workers
+        )
+    except Exception as e:
+        log(f"API 오류: {e}")
+        return 1
+    if args.keyword.strip():
+        df = apply_apt_keyword_filter(df, args.keyword)
+
+    if df.empty:
+        # 이전 실행의 요약 파일과 새 manifest가 섞이지 않도록 아무것도 쓰지 않고 종료
+        log("조회된 거래가 없어 저장하지 않습니다.")
+        return 1
+
+    out_dir = os.path.join(args.out, TRADE_TYPE_SLUGS[args.trade_type])
+    os.makedirs(out_dir, exist_ok=True)
+    df = add_partition_columns(df, regions)
+    write_partitioned_dataset(df, os.path.join(out_dir, "transactions"))
+    outputs = ["transactions"]
+
+    summary = build_monthly_summary(df, args.trade_type)
+    summary.to_parquet(os.path.join(out_dir, "summary_monthly.parquet"), index=False)
+    outputs.append("summary_monthly.parquet")
+    if args.trade_type == "전월세":
+        rates = estimate_conversion_rates(df, segment_col="지역", method=args.conversion_method)
+        rates["segment"] = rates["segment"].astype(str)
+        rates.to_parquet(os.path.join(out_dir, "conversion_rates.parquet"), index=False)
+        outputs.append("conversion_rates.parquet")
+
+    manifest = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "data_source": get_data_source_name(),
+        "trade_type": args.trade_type,
+        "start_ym": args.start,
+        "end_ym": args.end,
+        "regions": [{"code": code, "name": name} for code, name in regions],
+        "unresolved_regions": unresolved,
+        "keyword": args.keyword.strip(),
+        "rows": int(len(df)),
+        "elapsed_sec": round(time.time() - started, 2),
+        "outputs": outputs,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    log(f"저장 완료: {out_dir} ({len(df):,}건, {manifest['elapsed_sec']}초)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""실거래 조회 데이터 소스 (공공데이터포털 API / 오프라인 모의 소스)
+
+환경 변수로 소스를 고릅니다.
+    REMON_DATA_SOURCE=public        공공데이터포털 TransactionPrice (기본값)
+    REMON_DATA_SOURCE=mock          합성 데이터 또는 녹화된 월별 응답을 돌려주는 로컬 모의 소스
+모의 소스 옵션:
+    REMON_MOCK_LATENCY_MS           요청당 기본 지연 (기본 0)
+    REMON_MOCK_JITTER_MS            요청당 추가 지연 상한 (기본 0)
+    REMON_MOCK_ERROR_RATE           요청 실패 확률 0~1 (기본 0)
+    REMON_MOCK_SEED                 합성 데이터/지연/오류 시드 (기본 0)
+    REMON_MOCK_ROWS                 월별 합성 거래 수 (기본 400)
+    REMON_MOCK_RECORDED_DIR         녹화 응답 디렉터리 (.cache/transactions와 같은 {시군구}/{sale|rent}/{YYYYMM}.parquet 구조)
+"""
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from PublicDataReader import TransactionPrice
+
+from synthetic_data import make_synthetic_month, synthetic_seed
+
+DATA_SOURCE_ENV = "REMON_DATA_SOURCE"
+DEFAULT_DATA_SOURCE = "public"
+RECORDED_TRADE_TYPE_SLUGS = {"매매": "sale", "전월세": "rent"}
+
+class TransactionHTTPError(ConnectionError):
+    """공공데이터포털이 HTTP 오류(429/5xx 등)로 응답한 요청 실패"""
+
+class PublicTransactionPrice(TransactionPrice):
+    """HTTP 오류 응답을 빈 결과 대신 예외로 알리는 TransactionPrice (빈 결과는 실제 무거래만 의미)"""
+
+    def _response_to_item_data(self, res, property_type, trade_type, sigungu_code, year_month):
+        if res.status_code != 200:
+            raise TransactionHTTPError(
+                f"{property_type} {trade_type} {sigungu_code} {year_month} 요청 실패 (HTTP {res.status_code})"
+            )
+        return super()._response_to_item_data(res, property_type, trade_type, sigungu_code, year_month)
+
+class MockTransactionError(ConnectionError):
+    """모의 소스가 설정된 오류율에 따라 발생시키는 일시적 요청 실패"""
+
+class MockTransactionPrice:
+    """TransactionPrice.get_data와 같은 호출 형식으로 결정적 합성/녹화 응답을 돌려주는 로컬 대체 소스"""
+
+    host = "mock.transaction-price.local"
+    cache_namespace = "mock"
+
+    def __init__(self, latency_sec=0.0, jitter_sec=0.0, error_rate=0.0, seed=0, rows_per_month=400, recorded_dir=None):
+        self.latency_sec = max(0.0, float(latency_sec))
+        self.jitter_sec = max(0.0, float(jitter_sec))
+        self.error_rate = min(1.0, max(0.0, float(error_rate)))
+        self.seed = int(seed)
+        self.rows_per_month = int(rows_per_month)
+        self.recorded_dir = recorded_dir
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def get_data(self, property_type, trade_type, sigungu_code, year_month=None, **kwargs):
+        """(시군구, 거래유형, 연월) 응답 반환 (같은 요청의 n번째 시도는 항상 같은 지연/성공 여부)"""
+        key = (property_type, trade_type, str(sigungu_code), str(year_month))
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+        rng = np.random.default_rng(synthetic_seed(self.seed, *key, attempt))
+
+        delay = self.latency_sec + (rng.uniform(0.0, self.jitter_sec) if self.jitter_sec else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and rng.random() < self.error_rate:
+            raise MockTransactionError(f"모의 API 오류: {sigungu_code} {trade_type} {year_month} (시도 {attempt + 1})")
+
+        if self.recorded_dir:
+            return self.load_recorded(trade_type, sigungu_code, year_month)
+        return make_synthetic_month(
+            trade_type,
+            str(sigungu_code),
+            str(year_month),
+            n_rows=self.rows_per_month,
+            seed=self.seed,
+            korean_columns=True,
+        )
+
+    def load_recorded(self, trade_type, sigungu_code, year_month):
+        """녹화된 월별 응답 로드 (없으면 거래 없음으로 간주)"""
+        slug = RECORDED_TRADE_TYPE_SLUGS.get(trade_type, str(trade_type))
+        path = os.path.join(self.recorded_dir, str(sigungu_code), slug, f"{year_month}.parquet")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path)
+
+def env_float(name, default):
+    """환경 변수 실수값 (없거나 잘못된 값이면 기본값)"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return float(default)
+
+def get_data_source_name():
+    """현재 설정된 데이터 소스 이름"""
+    name = os.environ.get(DATA_SOURCE_ENV, DEFAULT_DATA_SOURCE).strip().lower()
+    return name if name in DATA_SOURCES else DEFAULT_DATA_SOURCE
+
+def create_mock_source(service_key=None):
+    """환경 변수 설정으로 모의 소스 생성 (인증키는 사용하지 않음)"""
+    return MockTransactionPrice(
+        latency_sec=env_float("REMON_MOCK_LATENCY_MS", 0) / 1000.0,
+        jitter_sec=env_float("REMON_MOCK_JITTER_MS", 0) / 1000.0,
+        error_rate=env_float("REMON_MOCK_ERROR_RATE", 0),
+        seed=int(env_float("REMON_MOCK_SEED", 0)),
+        rows_per_month=int(env_float("REMON_MOCK_ROWS", 400)),
+        recorded_dir=os.environ.get("REMON_MOCK_RECORDED_DIR") or None,
+    )
+
+DATA_SOURCES = {
+    "public": PublicTransactionPrice,
+    "mock": create_mock_source,
+}
+
+def requires_service_key(source=None):
+    """데이터 소스가 공공데이터포털 인증키를 필요로 하는지 여부"""
+    return (source or get_data_source_name()) == "public"
+
+def create_transaction_api(service_key, source=None):
+    """설정된 소스의 조회 객체 생성 (get_data(property_type, trade_type, sigungu_code, year_month) 제공)"""
+    return DATA_SOURCES[source or get_data_source_name()](service_key)
@@ -0,0 +1,57 @@
+"""조회 결과 내보내기 (CSV / Parquet / Arrow IPC, 다운로드 버튼을 누를 때만 생성)"""
+import codecs
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+EXPORT_CSV_CHUNK_ROWS = 50_000
+
+def to_export_table(df):
+    """결과 프레임을 타입이 유지된 Arrow 테이블로 변환 (범주형은 dictionary, 혼합 object 컬럼은 문자열)"""
+    frame = df.reset_index(drop=True)
+    for col in frame.columns:
+        if frame[col].dtype == object and pd.api.types.infer_dtype(frame[col], skipna=True) not in ("string", "empty"):
+            frame[col] = frame[col].astype("string")
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CSV_CHUNK_ROWS):
+    """CSV를 chunk_rows행 단위 UTF-8 바이트 조각으로 생성 (엑셀 호환 BOM·헤더는 첫 조각에만)"""
+    yield codecs.BOM_UTF8
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=(start == 0)).encode("utf-8")
+
+def write_csv_chunked(df, fileobj, chunk_rows=EXPORT_CSV_CHUNK_ROWS):
+    """CSV 조각을 순서대로 파일 객체에 기록"""
+    for chunk in iter_csv_chunks(df, chunk_rows=chunk_rows):
+        fileobj.write(chunk)
+    return fileobj
+
+def export_csv_buffer(df):
+    """CSV(utf-8-sig) 전체를 담은 버퍼 (다운로드 버튼은 완성된 바이트가 필요해 전체 크기만큼 메모리를 쓰며, 조각 단위로 인코딩해 전체 CSV 문자열 사본만 생략)"""
+    buffer = io.BytesIO()
+    write_csv_chunked(df, buffer)
+    return buffer
+
+def export_parquet_bytes(df):
+    """Parquet(zstd) 바이트"""
+    buffer = io.BytesIO()
+    pq.write_table(to_export_table(df), buffer, compression="zstd")
+    return buffer.getvalue()
+
+def export_arrow_bytes(df):
+    """Arrow IPC 파일(Feather v2) 바이트"""
+    table = to_export_table(df)
+    sink = pa.BufferOutputStream()
+    with pa_ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# 형식 이름 → (확장자, MIME, 생성 함수)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", export_csv_buffer),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", export_parquet_bytes),
+    "Arrow": ("arrow", "application/vnd.apache.arrow.file", export_arrow_bytes),
+}
@@ -0,0 +1,1229 @@
+"""실거래가 수집·정제·필터·집계 파이프라인 (Streamlit UI와 분리된 순수 데이터 로직)"""
+import os
+import re
+import datetime
+import hashlib
+import bisect
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from PublicDataReader import code_bdong
+
+from data_sources import create_transaction_api
+
+@functools.lru_cache(maxsize=None)
+def load_bdong_data():
+    """법정동 코드 데이터 로드"""
+    return code_bdong()
+
+@functools.lru_cache(maxsize=None)
+def load_region_index():
+    """활성 법정동 코드 테이블과 지역명→시군구 검색 인덱스를 프로세스당 1회 구성 (실패 시 error에 사유 기록)"""
+    index = {"active": pd.DataFrame(), "names": {}, "positions": {}, "sorted_names": [], "sido": {}, "error": None}
+    try:
+        df = load_bdong_data()
+    except Exception as e:
+        index["error"] = str(e)
+        return index
+    if df is None or df.empty:
+        return index
+
+    active_df = df[df['말소일자'].isna() | (df['말소일자'] == '')].reset_index(drop=True)
+    active_df = active_df[active_df['시군구명'].fillna('') != ''].reset_index(drop=True)
+    names = {}
+    sido = {}
+    for pos, (sido_name, sigungu_name, dong_name, code) in enumerate(zip(
+        active_df['시도명'], active_df['시군구명'], active_df['읍면동명'], active_df['시군구코드']
+    )):
+        region = (str(code), f"{sido_name} {sigungu_name}")
+        for name in (sigungu_name, dong_name):
+            if name:
+                names.setdefault(name, {}).setdefault(region, pos)
+        if sido_name and not str(code).endswith('000'):
+            sido.setdefault(sido_name, {}).setdefault(region, pos)
+
+    index["active"] = active_df
+    index["names"] = {n: sorted(r, key=r.get) for n, r in names.items()}
+    index["positions"] = {n: min(r.values()) for n, r in names.items()}
+    index["sorted_names"] = sorted(names)
+    index["sido"] = {n: sorted(r, key=r.get) for n, r in sido.items()}
+    return index
+
+def search_region_candidates(query, limit=None):
+    """지역명 후보 검색 (정확 일치 → 접두어 일치 → 부분 일치 순)"""
+    query = str(query or "").strip()
+    if not query:
+        return []
+    index = load_region_index()
+    names = index["names"]
+    if not names:
+        return []
+
+    sorted_names = index["sorted_names"]
+    positions = index["positions"]
+    exact = [query] if query in names else []
+    prefix = []
+    i = bisect.bisect_left(sorted_names, query)
+    while i < len(sorted_names) and sorted_names[i].startswith(query):
+        if sorted_names[i] != query:
+            prefix.append(sorted_names[i])
+        i += 1
+    matched = set(exact) | set(prefix)
+    substring = [n for n in sorted_names if query in n and n not in matched]
+
+    candidates = []
+    seen = set()
+    for tier in (exact, prefix, substring):
+        # 동일 단계 내에서는 원본 코드표 순서를 유지
+        for name in sorted(tier, key=positions.get):
+            for region in names[name]:
+                if region not in seen:
+                    seen.add(region)
+                    candidates.append(region)
+                    if limit and len(candidates) >= limit:
+                        return candidates
+    return candidates
+
+def get_region_code(region_name):
+    """지역명을 입력받아 5자리 시군구 코드를 반환"""
+    candidates = search_region_candidates(region_name, limit=1)
+    if candidates:
+        return candidates[0]
+    return None, None
+
+def split_region_input(region_input):
+    """쉼표로 구분된 지역 입력을 개별 지역명 목록으로 분리"""
+    tokens = [t.strip() for t in re.split(r'[,，]', str(region_input or ""))]
+    return [t for t in tokens if t]
+
+def get_sido_region_codes(sido_name):
+    """시도명(또는 접두어)에 속한 전체 시군구 코드 목록 반환"""
+    sido = load_region_index()["sido"]
+    matched = [n for n in sido if n == sido_name] or [n for n in sido if n.startswith(sido_name)]
+    if len(matched) != 1:
+        return []
+    return list(sido[matched[0]])
+
+def describe_region_ambiguity(region_input, max_candidates=4):
+    """여러 지역과 일치하는 입력에 대해 후보 안내 문구 생성"""
+    notes = []
+    for token in split_region_input(region_input):
+        candidates = search_region_candidates(token, limit=max_candidates + 1)
+        if len(candidates) <= 1:
+            continue
+        shown = ", ".join(name for _, name in candidates[:max_candidates])
+        more = " 외" if len(candidates) > max_candidates else ""
+        notes.append(f"'{token}' → {shown}{more} (첫 후보로 조회)")
+    return notes
+
+def resolve_region_codes(region_input):
+    """여러 지역명/시도명을 (시군구코드, 지역명) 목록으로 변환"""
+    regions = []
+    unresolved = []
+    seen = set()
+    for token in split_region_input(region_input):
+        sigungu_code, full_region_name = get_region_code(token)
+        matches = [(sigungu_code, full_region_name)] if sigungu_code else get_sido_region_codes(token)
+        if not matches:
+            unresolved.append(token)
+            continue
+        for code, name in matches:
+            if code not in seen:
+                seen.add(code)
+                regions.append((code, name))
+    return regions, unresolved
+
+def summarize_region_names(regions):
+    """조회 지역 목록을 화면 표시용 이름으로 요약"""
+    if not regions:
+        return ""
+    if len(regions) == 1:
+        return regions[0][1]
+    return f"{regions[0][1]} 외 {len(regions) - 1}개 지역"
+
+TRANSACTION_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache", "transactions")
+
+TRANSACTION_API_HOST = "apis.data.go.kr"
+FETCH_MAX_WORKERS = 6
+# 공공데이터포털은 초당이 아닌 일일 호출 건수로 제한하므로 평균 속도만 완만히 제한하고 작업자 수만큼 동시 요청 허용
+API_RATE_PER_SEC = 30.0
+API_RATE_BURST = FETCH_MAX_WORKERS
+FETCH_MAX_RETRIES = 2
+FETCH_RETRY_BACKOFF_SEC = 0.5
+
+TRADE_TYPE_SLUGS = {
+    "매매": "sale",
+    "전월세": "rent",
+}
+
+def iter_year_months(start_ym, end_ym):
+    """YYYYMM 구간을 월 단위 문자열 목록으로 전개"""
+    year, month = int(str(start_ym)[:4]), int(str(start_ym)[4:6])
+    end_year, end_month = int(str(end_ym)[:4]), int(str(end_ym)[4:6])
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append(f"{year:04d}{month:02d}")
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return months
+
+def is_closed_month(year_month, today=None):
+    """당월/전월(지연 신고 반영 기간)을 제외한 마감 월 여부"""
+    today = today or datetime.date.today()
+    prev_year, prev_month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    return str(year_month) < f"{prev_year:04d}{prev_month:02d}"
+
+def get_month_cache_path(sigungu_code, trade_type, year_month, namespace=None):
+    """(시군구코드, 거래유형, 연월) 단위 캐시 파일 경로 (공공 API 외 소스는 namespace 하위에 분리)"""
+    slug = TRADE_TYPE_SLUGS.get(trade_type, hashlib.sha256(str(trade_type).encode("utf-8")).hexdigest()[:8])
+    base_dir = os.path.join(TRANSACTION_CACHE_DIR, f"_{namespace}") if namespace else TRANSACTION_CACHE_DIR
+    return os.path.join(base_dir, str(sigungu_code), slug, f"{year_month}.parquet")
+
+def load_cached_month(sigungu_code, trade_type, year_month, namespace=None):
+    """마감 월 캐시 로드 (없거나 손상 시 None)"""
+    path = get_month_cache_path(sigungu_code, trade_type, year_month, namespace)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        return None
+
+def save_cached_month(sigungu_code, trade_type, year_month, df, namespace=None):
+    """월 단위 조회 결과를 캐시 파일로 저장"""
+    path = get_month_cache_path(sigungu_code, trade_type, year_month, namespace)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, path)
+    except Exception:
+        pass
+
+class HostRateLimiter:
+    """호스트 단위 토큰 버킷 요청 제한기 (burst건까지 바로 시작, 이후 초당 rate건 유지, 스레드 안전)"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+
+    def wait(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            # 토큰이 모자라면 미리 차감해 두고 채워질 때까지만 대기 (대기 순서대로 시작 시각 예약)
+            self._tokens -= 1.0
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+@functools.lru_cache(maxsize=None)
+def get_host_rate_limiter(host):
+    """프로세스 전역에서 공유하는 호스트별 요청 제한기"""
+    return HostRateLimiter(API_RATE_PER_SEC, API_RATE_BURST)
+
+def fetch_month_data(api, sigungu_code, trade_type, year_month, rate_limiter=None, max_retries=FETCH_MAX_RETRIES):
+    """단일 월 실거래 조회 (마감 월은 디스크 캐시 우선, 요청 실패는 지수 백오프로 재시도)"""
+    namespace = getattr(api, "cache_namespace", None)
+    closed = is_closed_month(year_month)
+    if closed:
+        # 0행 캐시는 거래가 없던 마감 월의 음성 결과이므로 그대로 사용
+        cached = load_cached_month(sigungu_code, trade_type, year_month, namespace)
+        if cached is not None:
+            return cached
+
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.wait()
+        try:
+            df = api.get_data(
+                property_type="아파트",
+                trade_type=trade_type,
+                sigungu_code=sigungu_code,
+                year_month=year_month
+            )
+            break
+        except Exception:
+            # HTTP 오류는 데이터 소스가 예외로 알리므로 오류 없이 끝난 빈 응답은 재시도하지 않음
+            if attempt >= max_retries:
+                raise
+        time.sleep(FETCH_RETRY_BACKOFF_SEC * (2 ** attempt))
+    if df is None:
+        df = pd.DataFrame()
+    if closed:
+        save_cached_month(sigungu_code, trade_type, year_month, df, namespace)
+    return df
+
+def build_fetch_jobs(sigungu_codes, start_ym, end_ym):
+    """(시군구코드, 연월) 단위 수집 작업 목록 생성"""
+    months = iter_year_months(start_ym, end_ym)
+    return [(str(code), ym) for code in sigungu_codes for ym in months]
+
+def iter_fetch_jobs(service_key, trade_type, jobs, max_workers=None, api=None):
+    """월/시군구 단위 작업을 제한된 스레드 풀에서 병렬 수집하며 완료 순서대로 (작업 순번, 결과) 반환 (api 미지정 시 설정된 데이터 소스 사용)"""
+    if not jobs:
+        return
+    if api is None:
+        api = create_transaction_api(service_key)
+    rate_limiter = get_host_rate_limiter(getattr(api, "host", TRANSACTION_API_HOST))
+    workers = max(1, min(max_workers or FETCH_MAX_WORKERS, len(jobs)))
+
+    def run_job(job):
+        sigungu_code, year_month = job
+        return fetch_month_data(api, sigungu_code, trade_type, year_month, rate_limiter=rate_limiter)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_job, job): idx for idx, job in enumerate(jobs)}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        except BaseException:
+            # 실패하거나 소비가 중단되면 아직 시작하지 않은 요청은 취소
+            for future in futures:
+                future.cancel()
+            raise
+
+def fetch_jobs_parallel(service_key, trade_type, jobs, max_workers=None, on_result=None, api=None):
+    """병렬 수집 결과를 작업 순서대로 반환 (on_result 지정 시 완료될 때마다 (작업, 결과) 전달)"""
+    frames = [None] * len(jobs)
+    for idx, frame in iter_fetch_jobs(service_key, trade_type, jobs, max_workers=max_workers, api=api):
+        frames[idx] = frame
+        if on_result is not None:
+            on_result(jobs[idx], frame)
+    return frames
+
+def fetch_transactions(service_key, regions, trade_type, start_ym, end_ym, jobs=None, on_batch=None, max_workers=None):
+    """여러 시군구의 조회 기간을 월 단위로 나눠 병렬 수집 후 지역 태그를 붙여 병합 (jobs 지정 시 해당 월만)"""
+    region_names = dict(regions)
+    if jobs is None:
+        jobs = build_fetch_jobs(list(region_names.keys()), start_ym, end_ym)
+    frames = fetch_jobs_parallel(service_key, trade_type, jobs, max_workers=max_workers, on_result=on_batch)
+
+    tagged = []
+    for (sigungu_code, _), frame in zip(jobs, frames):
+        if frame is None or frame.empty:
+            continue
+        tagged.append(frame.assign(지역=region_names[sigungu_code]))
+    if not tagged:
+        return pd.DataFrame()
+    return pd.concat(tagged, ignore_index=True)
+
+def standardize_columns(df):
+    """API 반환 컬럼명을 앱에서 사용하는 표준 명칭으로 변경"""
+    df.columns = [col.strip() for col in df.columns]
+    mapping = {
+        '아파트': ['단지', '단지명', '건물명', 'aptNm', '아파트'],
+        '매매가': ['거래금액', '거래금액(만원)', 'dealAmount', '매매가'],
+        '보증금': ['보증금액', '보증금(만원)', 'deposit', '보증금'],
+        '월세': ['월세액', '월세금액', '월세(만원)', 'monthlyRent', '월세'],
+        '전용면적': ['excluUseAr', '전용면적(㎡)', '면적', '전용면적'],
+        '층': ['floor', '층수', '층'],
+        '년': ['dealYear', '계약년도', '년'],
+        '월': ['dealMonth', '계약월', '월'],
+        '일': ['dealDay', '계약일', '일']
+    }
+    for standard, candidates in mapping.items():
+        for col in candidates:
+            if col in df.columns:
+                df = df.rename(columns={col: standard})
+                break
+    return df
+
+def to_numeric_safe(x):
+    """문자열 숫자를 안전하게 숫자로 변환"""
+    if pd.isna(x) or x == '': return 0.0
+    val = re.sub(r'[^0-9.]', '', str(x))
+    return float(val) if val else 0.0
+
+def to_numeric_series(series):
+    """문자열 숫자 컬럼을 벡터 연산으로 일괄 변환 (to_numeric_safe와 동일한 값, 빈 값은 0.0)"""
+    text = series.astype(str)
+    blank = series.isna() | (text == '')
+    cleaned = text.str.replace(r'[^0-9.]', '', regex=True)
+    values = pd.to_numeric(cleaned.mask(cleaned == '', '0'), errors='coerce')
+    return values.astype(float).mask(blank, 0.0).fillna(0.0)
+
+SUPPLY_PYEONG_BANDS = [
+    ((39, 40), "16~18평형"),
+    ((49, 51), "20~22평형"),
+    ((59, 59), "24~26평형"),
+    ((72, 74), "28~30평형"),
+    ((84, 85), "32~35평형"),
+    ((101, 102), "39~41평형"),
+]
+
+SUPPLY_PYEONG_ANCHORS = [
+    (39.5, 17.0),
+    (50.0, 21.0),
+    (59.0, 25.0),
+    (73.0, 29.0),
+    (84.5, 33.5),
+    (101.5, 40.0),
+]
+
+SUPPLY_BAND_CENTERS = {
+    "16~18평형": 17.0,
+    "20~22평형": 21.0,
+    "24~26평형": 25.0,
+    "28~30평형": 29.0,
+    "32~35평형": 33.5,
+    "39~41평형": 40.0,
+}
+
+def estimate_supply_pyeong(area_m2):
+    """기준 앵커를 이용해 전용면적(㎡)을 공급평수(평)로 선형 보간/외삽"""
+    if pd.isna(area_m2):
+        return None
+
+    x = float(area_m2)
+    anchors = SUPPLY_PYEONG_ANCHORS
+
+    if x <= anchors[0][0]:
+        x0, y0 = anchors[0]
+        x1, y1 = anchors[1]
+    elif x >= anchors[-1][0]:
+        x0, y0 = anchors[-2]
+        x1, y1 = anchors[-1]
+    else:
+        x0 = y0 = x1 = y1 = None
+        for i in range(len(anchors) - 1):
+            ax0, ay0 = anchors[i]
+            ax1, ay1 = anchors[i + 1]
+            if ax0 <= x <= ax1:
+                x0, y0, x1, y1 = ax0, ay0, ax1, ay1
+                break
+
+    if x1 == x0:
+        return y0
+    return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
+def to_supply_pyeong_band(area_m2):
+    """보간된 공급평수를 가장 가까운 평형대 라벨로 매핑"""
+    est = estimate_supply_pyeong(area_m2)
+    if est is None:
+        return None
+    return min(SUPPLY_BAND_CENTERS.keys(), key=lambda k: abs(SUPPLY_BAND_CENTERS[k] - est))
+
+def estimate_supply_pyeong_series(area_m2):
+    """estimate_supply_pyeong의 벡터화 버전 (구간별 선형 보간 + 양끝 외삽)"""
+    x = pd.to_numeric(pd.Series(area_m2), errors='coerce').to_numpy(dtype=float)
+    anchor_x = np.array([a for a, _ in SUPPLY_PYEONG_ANCHORS], dtype=float)
+    anchor_y = np.array([p for _, p in SUPPLY_PYEONG_ANCHORS], dtype=float)
+
+    # 앵커 경계값은 왼쪽 구간에 속하도록 side='left' 사용 (스칼라 버전과 동일한 구간 선택)
+    seg = np.clip(np.searchsorted(anchor_x, x, side='left') - 1, 0, len(anchor_x) - 2)
+    x0, x1 = anchor_x[seg], anchor_x[seg + 1]
+    y0, y1 = anchor_y[seg], anchor_y[seg + 1]
+    return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
+def to_supply_pyeong_band_series(area_m2):
+    """전용면적 컬럼을 가장 가까운 평형대 라벨의 Categorical 컬럼으로 일괄 매핑"""
+    index = area_m2.index if isinstance(area_m2, pd.Series) else None
+    est = estimate_supply_pyeong_series(area_m2)
+    labels = list(SUPPLY_BAND_CENTERS.keys())
+    centers = np.array(list(SUPPLY_BAND_CENTERS.values()), dtype=float)
+
+    nearest = np.abs(est[:, None] - centers[None, :]).argmin(axis=1) if len(est) else np.array([], dtype=int)
+    band_order = [label for _, label in SUPPLY_PYEONG_BANDS]
+    label_codes = np.array([band_order.index(label) for label in labels])
+    codes = np.where(np.isnan(est), -1, label_codes[nearest])
+    categorical = pd.Categorical.from_codes(codes, categories=band_order)
+    return pd.Series(categorical, index=index)
+
+@functools.lru_cache(maxsize=256)
+def compile_apt_keyword_expr(expr):
+    """아파트 키워드 조건식(AND/OR/NOT)을 (포함어, 제외어) 그룹의 OR 목록으로 컴파일"""
+    if not expr or not str(expr).strip():
+        return ()
+
+    q = str(expr).strip()
+    q = re.sub(r'\s+(?i:or)\s+', '|', q)
+    q = re.sub(r'\s+(?i:and)\s+', '&', q)
+    groups = [g.strip() for g in q.split('|') if g.strip()]
+
+    compiled = []
+    for g in groups:
+        terms = [t.strip() for t in re.split(r'&', g) if t.strip()]
+        include_terms = []
+        exclude_terms = []
+
+        for t in terms:
+            t_clean = t.strip()
+            if t_clean.startswith('-') or t_clean.startswith('!'):
+                word = t_clean[1:].strip()
+                if word:
+                    exclude_terms.append(word)
+            elif re.match(r'(?i)^not\s+', t_clean):
+                word = re.sub(r'(?i)^not\s+', '', t_clean).strip()
+                if word:
+                    exclude_terms.append(word)
+            else:
+                include_terms.append(t_clean)
+
+        # 그룹 내 중복 항과 동일 그룹은 한 번만 평가
+        group = (tuple(dict.fromkeys(include_terms)), tuple(dict.fromkeys(exclude_terms)))
+        if group not in compiled:
+            compiled.append(group)
+    return tuple(compiled)
+
+def match_apt_keyword_names(names, compiled):
+    """고유 단지명 목록에 컴파일된 조건식을 평가해 불리언 배열 반환"""
+    names = pd.Series(list(names), dtype=object)
+    term_hits = {}
+
+    def hit(term):
+        if term not in term_hits:
+            term_hits[term] = names.str.contains(term, na=False, case=False).to_numpy(dtype=bool)
+        return term_hits[term]
+
+    result = np.zeros(len(names), dtype=bool)
+    # 제외어 없는 단일 포함어 그룹들은 하나의 정규식 대안(|)으로 병합해 한 번에 검사
+    simple_terms = [inc[0] for inc, exc in compiled if len(inc) == 1 and not exc]
+    merged = False
+    if len(simple_terms) > 1:
+        pattern = "|".join(f"(?:{t})" for t in simple_terms)
+        try:
+            re.compile(pattern)
+            result |= names.str.contains(pattern, na=False, case=False).to_numpy(dtype=bool)
+            merged = True
+        except re.error:
+            merged = False
+
+    for include_terms, exclude_terms in compiled:
+        if merged and len(include_terms) == 1 and not exclude_terms:
+            continue
+        group_mask = np.ones(len(names), dtype=bool)
+        for w in include_terms:
+            group_mask &= hit(w)
+        for w in exclude_terms:
+            group_mask &= ~hit(w)
+        result |= group_mask
+    return result
+
+def apply_apt_keyword_filter(df, expr):
+    """아파트 키워드 조건식(AND/OR/NOT)을 고유 단지명 단위로 평가해 적용"""
+    if df is None or df.empty or '아파트' not in df.columns:
+        return df
+    if not expr or not str(expr).strip():
+        return df
+
+    compiled = compile_apt_keyword_expr(str(expr).strip())
+    if not compiled:
+        return df
+
+    # 행 단위 대신 고유 단지명만 평가하고 범주 코드로 전체 행에 펼침
+    names = df['아파트']
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        uniques = [str(c) for c in names.cat.categories] + ['nan']
+        codes = names.cat.codes.to_numpy()
+        codes = np.where(codes < 0, len(uniques) - 1, codes)
+    else:
+        codes, unique_vals = pd.factorize(names, use_na_sentinel=False)
+        uniques = [str(v) for v in unique_vals]
+
+    name_mask = match_apt_keyword_names(uniques, compiled)
+    return df[name_mask[codes]]
+
+FILTER_MASK_CACHE_MAX = 48
+
+def filter_spec_key(spec):
+    """필터 조건(spec)을 메모이즈용 해시 키로 변환"""
+    items = []
+    for k in sorted(spec):
+        v = spec[k]
+        if isinstance(v, (list, tuple, set)):
+            v = frozenset(v)
+        items.append((k, v))
+    return tuple(items)
+
+def get_numeric_array(df, col, cache=None):
+    """컬럼의 숫자 변환 배열 (변환 실패는 NaN, 캐시 재사용)"""
+    key = ("numeric", col)
+    if cache is not None and key in cache:
+        return cache[key]
+    values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if cache is not None:
+        cache[key] = values
+    return values
+
+def evaluate_filter_spec(df, spec, cache=None):
+    """단일 필터 조건을 전체 행 기준 불리언 배열로 평가"""
+    kind = spec["kind"]
+    col = spec["col"]
+    if kind == "range":
+        values = get_numeric_array(df, col, cache)
+        return (values >= spec["low"]) & (values <= spec["high"])
+    if kind == "isin":
+        return df[col].isin(spec["values"]).to_numpy()
+    if kind == "int_isin":
+        values = get_numeric_array(df, col, cache)
+        return np.isin(values, np.asarray(spec["values"], dtype=float))
+    if kind == "area_round_isin":
+        values = np.round(get_numeric_array(df, col, cache), 1)
+        return np.isin(values, np.asarray(spec["values"], dtype=float))
+    if kind == "area_band_isin":
+        bands = to_supply_pyeong_band_series(get_numeric_array(df, col, cache))
+        return bands.isin(spec["values"]).to_numpy()
+    if kind == "str_isin":
+        return df[col].astype(str).isin(spec["values"]).to_numpy()
+    if kind == "contains":
+        return df[col].astype(str).str.contains(spec["keyword"], na=False, case=False).to_numpy()
+    raise ValueError(f"지원하지 않는 필터 유형입니다: {kind}")
+
+def compile_filter_mask(df, specs, cache=None):
+    """필터 조건 목록을 하나의 NumPy 불리언 마스크로 결합 (조건별 마스크 메모이즈)"""
+    mask = np.ones(len(df), dtype=bool)
+    for spec in specs:
+        key = ("mask", filter_spec_key(spec))
+        component = cache.get(key) if cache is not None else None
+        if component is None:
+            component = evaluate_filter_spec(df, spec, cache)
+            if cache is not None:
+                if len(cache) >= FILTER_MASK_CACHE_MAX:
+                    cache.clear()
+                cache[key] = component
+        mask &= component
+    return mask
+
+def mask_digest(mask):
+    """불리언 마스크를 비트로 압축해 필터 상태 식별용 해시 생성"""
+    return hashlib.sha1(np.packbits(np.asarray(mask, dtype=bool)).tobytes()).hexdigest()
+
+def search_table_rows(df, query):
+    """모든 컬럼에서 검색어를 포함하는 행 위치 반환 (범주형은 카테고리 단위로 한 번만 검사)"""
+    hit = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            matched = series.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+            hit |= np.isin(series.cat.codes.to_numpy(), np.flatnonzero(matched))
+        else:
+            text = series.astype(str).mask(series.isna(), "")
+            hit |= text.str.contains(query, case=False, regex=False).to_numpy()
+    return np.flatnonzero(hit)
+
+def sort_table_rows(df, positions, sort_col, ascending):
+    """행 위치 배열을 지정 컬럼 기준으로 정렬 (결측값은 항상 마지막)"""
+    series = df[sort_col].iloc[positions].reset_index(drop=True)
+    try:
+        order = series.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    except TypeError:
+        order = series.astype(str).sort_values(ascending=ascending, kind='stable').index.to_numpy()
+    return positions[order]
+
+def build_table_page_html(df, positions, table_class="modern-deal-table"):
+    """지정한 행 위치만 문자열로 변환해 테이블 HTML 생성 (범주형은 object로 풀어 빈 값 처리)"""
+    page_df = df.iloc[positions]
+    category_cols = [c for c in page_df.columns if isinstance(page_df[c].dtype, pd.CategoricalDtype)]
+    safe_df = page_df.astype({c: object for c in category_cols}).fillna("")
+    safe_df.columns = [str(col) for col in safe_df.columns]
+    return safe_df.to_html(
+        index=False,
+        classes=table_class,
+        border=0,
+        escape=True,
+    )
+
+def make_period_frame(df):
+    """거래일 기준 월 단위 집계 프레임 생성"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if not all(c in df.columns for c in ['년', '월']):
+        return pd.DataFrame()
+
+    # 조회 시점에 거래일/거래월이 준비된 데이터셋은 재계산 없이 정렬만 수행
+    if {'deal_date', 'period'}.issubset(df.columns):
+        work = df.dropna(subset=['deal_date']).sort_values('deal_date')
+        return work if not work.empty else pd.DataFrame()
+
+    work = df.copy()
+    if '일' in work.columns:
+        day_vals = pd.to_numeric(work['일'], errors='coerce').fillna(1).astype(int)
+    else:
+        day_vals = pd.Series(1, index=work.index)
+
+    date_str = (
+        pd.to_numeric(work['년'], errors='coerce').fillna(0).astype(int).astype(str).str.zfill(4) + "-" +
+        pd.to_numeric(work['월'], errors='coerce').fillna(0).astype(int).astype(str).str.zfill(2) + "-" +
+        day_vals.astype(str).str.zfill(2)
+    )
+    work['deal_date'] = pd.to_datetime(date_str, errors='coerce')
+    work = work.dropna(subset=['deal_date']).sort_values('deal_date')
+    if work.empty:
+        return pd.DataFrame()
+
+    work['period'] = work['deal_date'].dt.to_period('M').astype(str)
+    return work
+
+NUMERIC_TARGET_COLS = ['매매가', '보증금', '월세', '전용면적', '층']
+
+def prepare_dataset(df):
+    """조회 직후 1회만 파생 컬럼(숫자값, 공급평형대, 거래일, 거래월, 단지명 범주형) 계산"""
+    if df is None or df.empty:
+        return df
+
+    for col in NUMERIC_TARGET_COLS:
+        if col in df.columns:
+            df[f'{col}_num'] = to_numeric_series(df[col])
+    if '전용면적_num' in df.columns:
+        df['공급평형대'] = to_supply_pyeong_band_series(df['전용면적_num'])
+
+    if all(c in df.columns for c in ['년', '월']):
+        day_vals = pd.to_numeric(df['일'], errors='coerce').astype(float).fillna(1) if '일' in df.columns else 1
+        df['deal_date'] = pd.to_datetime(
+            pd.DataFrame({
+                'year': pd.to_numeric(df['년'], errors='coerce').astype(float),
+                'month': pd.to_numeric(df['월'], errors='coerce').astype(float),
+                'day': day_vals,
+            }, index=df.index),
+            errors='coerce'
+        )
+        df['period'] = df['deal_date'].dt.strftime('%Y-%m')
+
+    if '아파트' in df.columns:
+        df['아파트'] = df['아파트'].astype('category')
+    return df
+
+TRANSACTION_SCHEMA = {
+    # 정수형으로 축소할 컬럼 (변환 시 새 결측이 생기면 원본 유지)
+    "small_int": ['년', '월', '일', '층', '층_num', 'buildYear', '건축년도'],
+    # 숫자 컬럼(_num)을 int32로 축소하고 원본 문자열 컬럼은 제거
+    "price": ['매매가', '보증금', '월세'],
+    # 범주형 변환 대상에서 제외할 파생 컬럼
+    "keep_object": ['period'],
+}
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+def downcast_integer_series(series):
+    """정수로 손실 없이 변환 가능한 컬럼을 가장 작은 정수형으로 축소"""
+    values = pd.to_numeric(series, errors='coerce')
+    if values.isna().sum() > series.isna().sum():
+        return series
+    valid = values.dropna()
+    if valid.empty or not (valid % 1 == 0).all():
+        return series
+    for dtype in ('int8', 'int16', 'int32'):
+        info = np.iinfo(dtype)
+        if valid.min() >= info.min and valid.max() <= info.max:
+            if values.isna().any():
+                return values.astype(dtype.capitalize())
+            return values.astype(dtype)
+    return series
+
+def compact_transaction_frame(df):
+    """스키마 기반으로 컬럼 dtype을 축소해 세션당 메모리 사용량 절감"""
+    if df is None or df.empty:
+        return df
+
+    for col in TRANSACTION_SCHEMA["small_int"]:
+        if col in df.columns:
+            df[col] = downcast_integer_series(df[col])
+
+    drop_cols = []
+    for col in TRANSACTION_SCHEMA["price"]:
+        num_col = f'{col}_num'
+        if num_col not in df.columns:
+            continue
+        values = df[num_col]
+        info = np.iinfo('int32')
+        if (values % 1 == 0).all() and values.min() >= info.min and values.max() <= info.max:
+            df[num_col] = values.astype('int32')
+        if col in df.columns:
+            drop_cols.append(col)
+    if drop_cols:
+        df = df.drop(columns=drop_cols)
+
+    row_count = len(df)
+    for col in df.columns:
+        if col in TRANSACTION_SCHEMA["keep_object"] or df[col].dtype != object:
+            continue
+        if df[col].nunique(dropna=True) <= row_count * CATEGORY_MAX_UNIQUE_RATIO:
+            df[col] = df[col].astype('category')
+    return df
+
+def get_display_labels(df):
+    """원본 문자열이 제거된 가격 컬럼은 숫자 컬럼을 원래 이름으로 표시"""
+    return {
+        f'{col}_num': col
+        for col in TRANSACTION_SCHEMA["price"]
+        if f'{col}_num' in df.columns and col not in df.columns
+    }
+
+def build_dataset_meta(df):
+    """필터 위젯이 재실행마다 다시 계산하던 고유값/범위 정보를 데이터셋 단위로 계산"""
+    meta = {"price_bounds": {}, "floor_values": [], "area_values": []}
+    if df is None or df.empty:
+        return meta
+
+    for col in ['매매가_num', '보증금_num', '월세_num']:
+        if col in df.columns:
+            meta["price_bounds"][col] = (int(df[col].min()), int(df[col].max()))
+    if '층_num' in df.columns:
+        meta["floor_values"] = sorted(df['층_num'].unique().astype(int).tolist())
+    if '전용면적_num' in df.columns:
+        meta["area_values"] = sorted(df['전용면적_num'].unique().tolist())
+    return meta
+
+CUBE_DIM_COLS = ['지역', '아파트', '공급평형대', '층구간', 'period']
+CUBE_VALUE_COLS = ['매매가_num', '보증금_num', '월세_num', '전용면적_num']
+FLOOR_BUCKET_SIZE = 5
+
+def to_floor_bucket(floors):
+    """층을 FLOOR_BUCKET_SIZE개 층 단위 구간 번호로 변환 (1~5층=0, 6~10층=1, 지하층은 음수)"""
+    return np.floor((np.asarray(floors, dtype=float) - 1) / FLOOR_BUCKET_SIZE)
+
+def aggregate_metric_cells(df, dims, value_cols):
+    """dims 조합별 거래 건수(n)와 값 컬럼별 건수/합계/최소/최대/제곱합 집계 (결측 키도 한 셀로 유지)"""
+    value_cols = [c for c in value_cols if c in df.columns]
+    work = df[dims].copy()
+    aggs = {}
+    for col in value_cols:
+        values = pd.to_numeric(df[col], errors='coerce').astype(float)
+        work[f'{col}_v'] = values
+        work[f'{col}_sq'] = values * values
+        aggs[f'{col}_cnt'] = (f'{col}_v', 'count')
+        aggs[f'{col}_sum'] = (f'{col}_v', 'sum')
+        aggs[f'{col}_min'] = (f'{col}_v', 'min')
+        aggs[f'{col}_max'] = (f'{col}_v', 'max')
+        aggs[f'{col}_sumsq'] = (f'{col}_sq', 'sum')
+    grouped = work.groupby(dims, observed=True, dropna=False, sort=False)
+    cells = grouped.size().rename('n').to_frame()
+    if aggs:
+        cells = cells.join(grouped.agg(**aggs))
+    return cells.reset_index()
+
+def rollup_metric_cells(cells, dims):
+    """집계 셀을 더 굵은 dims 단위로 재집계 (건수·합계·제곱합은 더하고 최소/최대는 다시 비교)"""
+    aggs = {}
+    for col in cells.columns:
+        if col == 'n' or col.endswith(('_cnt', '_sum', '_sumsq')):
+            aggs[col] = 'sum'
+        elif col.endswith('_min'):
+            aggs[col] = 'min'
+        elif col.endswith('_max'):
+            aggs[col] = 'max'
+    return cells.groupby(dims, observed=True, dropna=False, sort=False).agg(aggs).reset_index()
+
+def build_metric_cube(df):
+    """(지역, 아파트, 공급평형대, 층구간, 거래월) 단위 집계 큐브와 필터 변환용 메타 정보 생성 (데이터셋당 1회)"""
+    cube = {"cells": pd.DataFrame(), "dims": [], "value_cols": [], "bounds": {}, "floor_buckets": {}, "area_values": None}
+    if df is None or df.empty:
+        return cube
+
+    work = df
+    if '층_num' in df.columns:
+        work = df.assign(층구간=to_floor_bucket(df['층_num']))
+    dims = [c for c in CUBE_DIM_COLS if c in work.columns]
+    value_cols = [c for c in CUBE_VALUE_COLS if c in work.columns]
+    if not dims:
+        return cube
+    cube.update(cells=aggregate_metric_cells(work, dims, value_cols), dims=dims, value_cols=value_cols)
+
+    for col in value_cols:
+        values = pd.to_numeric(df[col], errors='coerce')
+        cube["bounds"][col] = (float(values.min()), float(values.max()), bool(values.isna().any()))
+    if '층_num' in df.columns:
+        floors = pd.to_numeric(df['층_num'], errors='coerce')
+        if not floors.isna().any():
+            unique_floors = np.unique(floors.to_numpy(dtype=float))
+            for bucket, floor in zip(to_floor_bucket(unique_floors), unique_floors):
+                cube["floor_buckets"].setdefault(float(bucket), set()).add(float(floor))
+    if '전용면적_num' in df.columns:
+        areas = pd.to_numeric(df['전용면적_num'], errors='coerce')
+        if not areas.isna().any():
+            cube["area_values"] = np.unique(areas.to_numpy(dtype=float))
+    return cube
+
+def cube_cell_mask(cube, specs):
+    """필터 조건을 큐브 셀 단위 마스크로 변환 (셀 경계와 맞지 않는 조건이 있으면 None → 원본 행으로 계산)"""
+    cells = cube["cells"]
+    if cells.empty:
+        return None
+    mask = np.ones(len(cells), dtype=bool)
+    for spec in specs:
+        kind, col = spec["kind"], spec["col"]
+        if kind == "range" and col in cube["bounds"]:
+            low, high, has_nan = cube["bounds"][col]
+            # 전체 범위를 덮는 슬라이더는 조건 없음과 같음 (결측 행은 범위 조건에서 빠지므로 제외)
+            if has_nan or spec["low"] > low or spec["high"] < high:
+                return None
+        elif kind in ("isin", "str_isin") and col in ('지역', '아파트', '공급평형대') and col in cells.columns:
+            dim = cells[col].astype(str) if kind == "str_isin" else cells[col]
+            mask &= dim.isin(spec["values"]).to_numpy()
+        elif kind == "area_band_isin" and col == '전용면적_num' and '공급평형대' in cells.columns:
+            mask &= cells['공급평형대'].isin(spec["values"]).to_numpy()
+        elif kind in ("isin", "int_isin") and col == '층_num' and cube["floor_buckets"]:
+            selected = {float(v) for v in spec["values"]}
+            kept = []
+            for bucket, floors in cube["floor_buckets"].items():
+                picked = floors & selected
+                if picked and picked != floors:
+                    return None
+                if picked:
+                    kept.append(bucket)
+            mask &= cells['층구간'].isin(kept).to_numpy()
+        elif kind in ("isin", "area_round_isin") and col == '전용면적_num' and cube["area_values"] is not None:
+            areas = cube["area_values"] if kind == "isin" else np.round(cube["area_values"], 1)
+            if not np.isin(areas, np.asarray(spec["values"], dtype=float)).all():
+                return None
+        else:
+            return None
+    return mask
+
+def summarize_metric_rows(df, value_cols=CUBE_VALUE_COLS):
+    """필터 결과 행에서 KPI(건수, 컬럼별 평균/최대) 계산"""
+    summary = {"count": int(len(df)), "mean": {}, "max": {}}
+    for col in value_cols:
+        if col in df.columns:
+            summary["mean"][col] = df[col].mean()
+            summary["max"][col] = df[col].max()
+    return summary
+
+def summarize_metric_cells(cells, value_cols=CUBE_VALUE_COLS):
+    """큐브 셀에서 KPI(건수, 컬럼별 평균/최대) 계산 (행 대신 셀 수에 비례)"""
+    summary = {"count": int(cells['n'].sum()) if 'n' in cells.columns else 0, "mean": {}, "max": {}}
+    for col in value_cols:
+        if f'{col}_cnt' not in cells.columns:
+            continue
+        count = cells[f'{col}_cnt'].sum()
+        summary["mean"][col] = cells[f'{col}_sum'].sum() / count if count else np.nan
+        summary["max"][col] = cells[f'{col}_max'].max()
+    return summary
+
+SHARED_DATASET_TTL_SEC = 30 * 60
+SHARED_DATASET_MAX_BYTES = 512 * 1024 * 1024
+
+INCREMENTAL_STALE_SEC = 30 * 60
+
+def sort_transactions(df):
+    """거래일 기준 최신순 정렬 (동일 일자는 기존 순서 유지)"""
+    sort_cols = [c for c in ['년', '월', '일'] if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(by=sort_cols, ascending=False, kind='stable').reset_index(drop=True)
+    return df
+
+def build_transaction_dataset(df):
+    """원본 수집 결과에 컬럼 표준화 → 파생 컬럼 → dtype 축소 → 최신순 정렬 적용"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = standardize_columns(df)
+    df = prepare_dataset(df)
+    df = compact_transaction_frame(df)
+    return sort_transactions(df)
+
+def load_transaction_dataset(service_key, regions, trade_type, start_ym, end_ym, on_batch=None, max_workers=None):
+    """조회 조건 전체 기간을 수집해 분석용 데이터셋 생성"""
+    df = fetch_transactions(service_key, regions, trade_type, start_ym, end_ym, on_batch=on_batch, max_workers=max_workers)
+    return build_transaction_dataset(df)
+
+def get_row_partitions(df, regions):
+    """각 행의 (시군구코드:연월) 파티션 키 계산"""
+    if df is None or df.empty or not {'년', '월'}.issubset(df.columns):
+        return pd.Series("", index=getattr(df, "index", None), dtype=object)
+    name_to_code = {name: code for code, name in regions}
+    if '지역' in df.columns:
+        codes = df['지역'].astype(object).map(name_to_code).fillna("")
+    else:
+        codes = pd.Series(regions[0][0] if len(regions) == 1 else "", index=df.index)
+    year = pd.to_numeric(df['년'], errors='coerce').fillna(0).astype(int)
+    month = pd.to_numeric(df['월'], errors='coerce').fillna(0).astype(int)
+    return codes.astype(str) + ":" + (year * 100 + month).astype(str)
+
+def plan_incremental_refresh(source, regions, trade_type, start_ym, end_ym, now=None):
+    """이미 불러온 월 정보와 비교해 새로 받을 (시군구, 연월) 작업 목록 계산 (재사용 불가 시 None)"""
+    if not source or source.get("trade_type") != trade_type:
+        return None
+    codes = sorted(code for code, _ in regions)
+    if sorted(source.get("codes", [])) != codes:
+        return None
+
+    now = now or time.time()
+    fetched = source.get("partitions", {})
+    jobs = []
+    for code, ym in build_fetch_jobs(codes, start_ym, end_ym):
+        fetched_at = fetched.get(f"{code}:{ym}")
+        if fetched_at is None:
+            jobs.append((code, ym))
+        elif not is_closed_month(ym) and now - fetched_at > INCREMENTAL_STALE_SEC:
+            # 당월/전월은 지연 신고·해제 신고가 반영될 수 있어 일정 시간이 지나면 다시 조회
+            jobs.append((code, ym))
+    return jobs
+
+def concat_transaction_frames(frames):
+    """범주형 컬럼의 카테고리를 통합한 뒤 병합해 object 컬럼으로 풀리지 않도록 처리"""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    cat_cols = {c for f in frames for c in f.columns if isinstance(f[c].dtype, pd.CategoricalDtype)}
+    for col in cat_cols:
+        categories = []
+        for f in frames:
+            if col not in f.columns:
+                continue
+            values = f[col].cat.categories if isinstance(f[col].dtype, pd.CategoricalDtype) else f[col].dropna().unique()
+            categories.extend(values)
+        dtype = pd.CategoricalDtype(list(dict.fromkeys(categories)))
+        frames = [f.assign(**{col: f[col].astype(dtype)}) if col in f.columns else f for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def get_loaded_partitions(df, regions):
+    """실제로 거래 행이 들어 있는 (시군구코드:연월) 파티션 키 집합"""
+    if df is None or df.empty or not {'년', '월'}.issubset(df.columns):
+        return set()
+    cols = [c for c in ('지역', '년', '월') if c in df.columns]
+    keys = get_row_partitions(df[cols].drop_duplicates(), regions)
+    return {key for key in keys if not key.startswith(":")}
+
+def merge_incremental_refresh(base_df, fresh_df, regions, start_ym, end_ym):
+    """기존 데이터에서 요청 범위 밖 월과 새로 받은 행이 있는 월을 제거하고 새로 받은 월을 병합 (재조회가 비면 기존 행 유지)"""
+    requested = {f"{code}:{ym}" for code, ym in build_fetch_jobs([c for c, _ in regions], start_ym, end_ym)}
+    replaced = get_loaded_partitions(fresh_df, regions)
+    frames = []
+    if base_df is not None and not base_df.empty:
+        partitions = get_row_partitions(base_df, regions)
+        keep = partitions.isin(requested - replaced).to_numpy()
+        frames.append(base_df[keep])
+    frames.append(fresh_df)
+
+    # 해제 신고는 API가 같은 행의 해제여부를 갱신해 돌려주므로, 재조회 월을 통째로 교체하면 그대로 반영됨
+    merged = concat_transaction_frames(frames)
+    if merged.empty:
+        return merged
+    return sort_transactions(merged)
+
+class LoaderAbandoned(Exception):
+    """공유 저장소의 적재 세션이 제어 예외로 중단되어 대기 세션이 다시 시도해야 함을 알림"""
+
+class SharedDatasetStore:
+    """세션 간 공유되는 조회 결과 저장소 (TTL, 메모리 상한 LRU, 동일 요청 병합)"""
+
+    def __init__(self, ttl_sec, max_bytes):
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._total_bytes = 0
+
+    def get_or_load(self, key, loader):
+        """캐시된 데이터셋 반환, 없으면 1개 세션만 loader를 실행하고 나머지는 결과를 대기 (실패·빈 결과는 보관하지 않음)"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    df, size, stored_at = entry
+                    if time.monotonic() - stored_at <= self.ttl_sec:
+                        self._entries.move_to_end(key)
+                        return df
+                    self._evict(key)
+
+                future = self._inflight.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = Future()
+                    self._inflight[key] = future
+
+            if is_leader:
+                break
+            try:
+                return future.result()
+            except LoaderAbandoned:
+                # 적재 세션이 재실행 등으로 중단되면 대기 세션 중 하나가 적재를 이어받음
+                continue
+
+        try:
+            df = loader()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # Streamlit 재실행/중단 같은 제어 예외는 다른 세션에 전달하지 않음
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(LoaderAbandoned())
+            raise
+
+        with self._lock:
+            # 빈 결과는 일시 오류·잘못된 인증키로 생겼을 수 있어 TTL 동안 다른 세션에 공유하지 않음
+            if df is not None and not df.empty:
+                self._store(key, df)
+            self._inflight.pop(key, None)
+        future.set_result(df)
+        return df
+
+    def _store(self, key, df):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (df, size, time.monotonic())
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+CONVERSION_MIN_SAMPLES = 8
+
+HUBER_K = 1.345
+HUBER_MAX_ITER = 30
+THEIL_SEN_MAX_POINTS = 300
+
+def grouped_line_fit(codes, x, y, n_groups, weights=None):
+    """그룹 코드별 (가중) 최소제곱 직선을 bincount 합산으로 한 번에 적합 (그룹 평균 중심화로 수치 안정성 확보)"""
+    w = np.ones_like(x) if weights is None else weights
+    w_sum = np.bincount(codes, weights=w, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.bincount(codes, weights=w * x, minlength=n_groups) / w_sum
+        y_mean = np.bincount(codes, weights=w * y, minlength=n_groups) / w_sum
+        dx = x - x_mean[codes]
+        dy = y - y_mean[codes]
+        sxx = np.bincount(codes, weights=w * dx * dx, minlength=n_groups)
+        sxy = np.bincount(codes, weights=w * dx * dy, minlength=n_groups)
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+    return slope, y_mean - slope * x_mean
+
+def grouped_r2(codes, x, y, n_groups, slope, intercept):
+    """그룹별 결정계수 (음수는 0으로 보정)"""
+    counts = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_mean = np.bincount(codes, weights=y, minlength=n_groups) / counts
+        resid = y - (intercept[codes] + slope[codes] * x)
+        ss_res = np.bincount(codes, weights=resid * resid, minlength=n_groups)
+        ss_tot = np.bincount(codes, weights=(y - y_mean[codes]) ** 2, minlength=n_groups)
+        r2 = np.where(ss_tot > 0, 1.0 - ss_res / ss_tot, 0.0)
+    return np.clip(np.nan_to_num(r2, nan=0.0), 0.0, None)
+
+def grouped_huber_fit(codes, x, y, n_groups):
+    """Huber 가중 IRLS를 모든 그룹에 동시에 적용 (잔차 척도는 그룹별 MAD)"""
+    slope, intercept = grouped_line_fit(codes, x, y, n_groups)
+    for _ in range(HUBER_MAX_ITER):
+        abs_resid = np.abs(y - (intercept[codes] + slope[codes] * x))
+        scale = pd.Series(abs_resid).groupby(codes).median().reindex(range(n_groups)).to_numpy() / 0.6745
+        row_scale = scale[codes]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weights = np.where(row_scale > 0, np.minimum(1.0, HUBER_K * row_scale / np.maximum(abs_resid, 1e-12)), 1.0)
+        new_slope, new_intercept = grouped_line_fit(codes, x, y, n_groups, weights=weights)
+        converged = np.nanmax(np.abs(new_slope - slope), initial=0.0) <= 1e-10
+        slope, intercept = new_slope, new_intercept
+        if converged:
+            break
+    return slope, intercept
+
+def grouped_theil_sen_fit(codes, x, y, n_groups):
+    """그룹별 Theil-Sen 추정 (쌍 기울기 중앙값, 큰 그룹은 고정 시드 표본으로 쌍 수 제한)"""
+    slope = np.full(n_groups, np.nan)
+    intercept = np.full(n_groups, np.nan)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    rng = np.random.default_rng(0)
+    for g in range(n_groups):
+        idx = order[bounds[g]:bounds[g + 1]]
+        if len(idx) < 2:
+            continue
+        sample = idx if len(idx) <= THEIL_SEN_MAX_POINTS else rng.choice(idx, THEIL_SEN_MAX_POINTS, replace=False)
+        i, j = np.triu_indices(len(sample), 1)
+        dx = x[sample][j] - x[sample][i]
+        valid = dx != 0
+        if not valid.any():
+            continue
+        slope[g] = np.median((y[sample][j] - y[sample][i])[valid] / dx[valid])
+        intercept[g] = np.median(y[idx] - slope[g] * x[idx])
+    return slope, intercept
+
+def estimate_conversion_rates(df, segment_col=None, method="ols", min_samples=CONVERSION_MIN_SAMPLES):
+    """보증금 1000만원당 월세 환산율을 세그먼트별로 한 번에 추정 (segment_col 미지정 시 전체 1행)"""
+    columns = ["segment", "n", "monthly_per_1000", "slope", "intercept", "r2"]
+    if df is None or df.empty or "보증금_num" not in df.columns or "월세_num" not in df.columns:
+        return pd.DataFrame(columns=columns)
+    if segment_col is not None and segment_col not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    x = pd.to_numeric(df["보증금_num"], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(df["월세_num"], errors="coerce").to_numpy(dtype=float)
+    if segment_col is None:
+        codes, labels = np.zeros(len(df), dtype=np.int64), pd.Index(["전체"])
+    else:
+        codes, labels = pd.factorize(df[segment_col], sort=True)
+        labels = pd.Index(labels)
+    valid = ~np.isnan(x) & ~np.isnan(y) & (codes >= 0)
+    x, y, codes = x[valid], y[valid], codes[valid].astype(np.int64)
+    n_groups = len(labels)
+    if n_groups == 0 or len(x) == 0:
+        return pd.DataFrame(columns=columns)
+
+    counts = np.bincount(codes, minlength=n_groups)
+    eligible = counts >= min_samples
+    keep = eligible[codes]
+    x, y, codes = x[keep], y[keep], codes[keep]
+    if len(x) == 0:
+        return pd.DataFrame(columns=columns)
+
+    if method == "huber":
+        slope, intercept = grouped_huber_fit(codes, x, y, n_groups)
+    elif method == "theil_sen":
+        slope, intercept = grouped_theil_sen_fit(codes, x, y, n_groups)
+    else:
+        slope, intercept = grouped_line_fit(codes, x, y, n_groups)
+    r2 = grouped_r2(codes, x, y, n_groups, slope, intercept)
+
+    result = pd.DataFrame({
+        "segment": labels.astype(object),
+        "n": counts,
+        "monthly_per_1000": slope * 1000.0,
+        "slope": slope,
+        "intercept": intercept,
+        "r2": r2,
+    })
+    return result[eligible & ~np.isnan(slope)].reset_index(drop=True)
+
+def estimate_deposit_monthly_equivalent(df, method="ols", rates=None):
+    """전월세 데이터로 보증금 1000만원당 월세 환산액(회귀 기울기 기반) 추정"""
+    if rates is None:
+        rates = estimate_conversion_rates(df, method=method)
+    if rates.empty:
+        return None
+    row = rates.iloc[0]
+    return {
+        "monthly_per_1000": float(row["monthly_per_1000"]),
+        "slope": float(row["slope"]),
+        "intercept": float(row["intercept"]),
+        "r2": float(row["r2"]),
+        "n": int(row["n"]),
+    }
+
+SUMMARY_VALUE_COLS = {
+    "매매": ['매매가_num'],
+    "전월세": ['보증금_num', '월세_num'],
+}
+
+def build_monthly_summary(df, trade_type, group_cols=('지역', 'period')):
+    """지역·거래월별 거래 건수와 가격 통계(평균/중앙값/최소/최대) 집계"""
+    group_cols = [c for c in group_cols if c in df.columns] if df is not None else []
+    value_cols = [c for c in SUMMARY_VALUE_COLS.get(trade_type, []) if df is not None and c in df.columns]
+    if df is None or df.empty or not group_cols:
+        return pd.DataFrame()
+
+    grouped = df.groupby(group_cols, observed=True, sort=True)
+    summary = grouped.size().rename('거래건수').to_frame()
+    for col in value_cols:
+        stats = grouped[col].agg(['mean', 'median', 'min', 'max'])
+        stats.columns = [f"{col.removesuffix('_num')}_{stat}" for stat in stats.columns]
+        summary = summary.join(stats)
+    return summary.reset_index()
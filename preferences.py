@@ -0,0 +1,103 @@
+"""사용자별 입력값 저장소 (SQLite WAL 키-값 테이블 + 프로세스 내 읽기 캐시)"""
+import contextlib
+import functools
+import json
+import os
+import sqlite3
+import threading
+
+PREFERENCE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".user_prefs.sqlite3")
+LEGACY_PREFS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".user_prefs.json")
+SQLITE_BUSY_TIMEOUT_SEC = 5.0
+
+class PreferenceStore:
+    """사용자 키 단위로 조회·갱신하는 입력값 저장소 (작업마다 짧은 연결, 키 단위 원자적 upsert)"""
+
+    def __init__(self, db_path, legacy_path=None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._cache = {}
+        with self.connect() as conn:
+            # WAL 모드는 DB 파일에 유지되므로 생성 시 한 번만 설정
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_prefs ("
+                "user_key TEXT PRIMARY KEY, prefs TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+        if legacy_path:
+            self.migrate_legacy_file(legacy_path)
+
+    @contextlib.contextmanager
+    def connect(self):
+        """작업 하나에만 쓰는 연결 (블록이 끝나면 커밋/롤백 후 닫음, Streamlit 스크립트 스레드마다 연결이 쌓이지 않음)"""
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SEC)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def migrate_legacy_file(self, legacy_path):
+        """기존 단일 JSON 파일의 사용자별 값을 한 번만 옮기고 파일 이름을 바꿔 재이관 방지"""
+        if not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        except Exception:
+            return
+        rows = [
+            (str(key), json.dumps(value, ensure_ascii=False))
+            for key, value in (loaded.items() if isinstance(loaded, dict) else [])
+            if isinstance(value, dict)
+        ]
+        with self.connect() as conn:
+            # 이미 저장소에 있는 키는 더 최신 값이므로 덮어쓰지 않음
+            conn.executemany(
+                "INSERT OR IGNORE INTO user_prefs (user_key, prefs, updated_at) VALUES (?, ?, strftime('%s', 'now'))",
+                rows,
+            )
+        try:
+            os.replace(legacy_path, f"{legacy_path}.migrated")
+        except OSError:
+            pass
+
+    def get(self, user_key):
+        """사용자 입력값 조회 (없으면 빈 dict)"""
+        with self._lock:
+            if user_key in self._cache:
+                return dict(self._cache[user_key])
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT prefs FROM user_prefs WHERE user_key = ?", (user_key,)
+            ).fetchone()
+        try:
+            value = json.loads(row[0]) if row else {}
+        except ValueError:
+            value = {}
+        if not isinstance(value, dict):
+            value = {}
+        with self._lock:
+            self._cache[user_key] = value
+        return dict(value)
+
+    def set(self, user_key, prefs):
+        """사용자 입력값 저장 (직전 값과 같으면 쓰기 생략)"""
+        prefs = dict(prefs)
+        with self._lock:
+            if self._cache.get(user_key) == prefs:
+                return
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO user_prefs (user_key, prefs, updated_at) VALUES (?, ?, strftime('%s', 'now')) "
+                "ON CONFLICT(user_key) DO UPDATE SET prefs = excluded.prefs, updated_at = excluded.updated_at",
+                (user_key, json.dumps(prefs, ensure_ascii=False)),
+            )
+        with self._lock:
+            self._cache[user_key] = prefs
+
+@functools.lru_cache(maxsize=None)
+def get_preference_store(db_path=PREFERENCE_DB_PATH, legacy_path=LEGACY_PREFS_PATH):
+    """프로세스 전역에서 공유하는 입력값 저장소"""
+    return PreferenceStore(db_path, legacy_path=legacy_path)
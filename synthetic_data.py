@@ -0,0 +1,127 @@
+"""오프라인 벤치마크·테스트용 합성 실거래 데이터 생성기 (PublicDataReader 아파트 매매/전월세 응답 형식)"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+SYNTHETIC_BRANDS = ["래미안", "힐스테이트", "자이", "푸르지오", "e편한세상", "롯데캐슬", "아이파크", "더샵", "센트럴", "리센츠"]
+SYNTHETIC_PLACES = ["잠실", "송파", "가락", "문정", "방이", "오금", "석촌", "삼전", "풍납", "거여"]
+SYNTHETIC_DONGS = ["잠실동", "신천동", "가락동", "문정동", "방이동", "오금동", "석촌동", "삼전동", "풍납동", "거여동"]
+SYNTHETIC_AREAS = np.array([39.6, 49.9, 59.97, 74.5, 84.99, 101.8, 114.9, 134.7])
+SYNTHETIC_AREA_WEIGHTS = np.array([0.05, 0.07, 0.28, 0.1, 0.34, 0.06, 0.07, 0.03])
+
+# PublicDataReader translate=True 응답 컬럼명 (영문 API 필드 → 한글)
+KOREAN_COLUMN_NAMES = {
+    "sggCd": "법정동시군구코드",
+    "umdNm": "법정동",
+    "aptNm": "단지명",
+    "jibun": "지번",
+    "excluUseAr": "전용면적",
+    "dealYear": "계약년도",
+    "dealMonth": "계약월",
+    "dealDay": "계약일",
+    "dealAmount": "거래금액",
+    "deposit": "보증금액",
+    "monthlyRent": "월세금액",
+    "floor": "층",
+    "buildYear": "건축년도",
+    "cdealType": "해제여부",
+    "cdealDay": "해제사유발생일",
+    "contractTerm": "계약기간",
+    "contractType": "계약구분",
+}
+
+def synthetic_seed(*parts):
+    """문자열 조합으로 재현 가능한 난수 시드 생성"""
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+def synthetic_complex_names(n_complexes, seed=0):
+    """브랜드·지명·차수를 조합한 단지명 목록 생성"""
+    n_combos = len(SYNTHETIC_BRANDS) * len(SYNTHETIC_PLACES)
+    names = []
+    for i in range(n_complexes):
+        combo, phase = i % n_combos, i // n_combos
+        name = f"{SYNTHETIC_BRANDS[combo % len(SYNTHETIC_BRANDS)]} {SYNTHETIC_PLACES[combo // len(SYNTHETIC_BRANDS)]}"
+        names.append(f"{name} {phase + 1}차" if phase else name)
+    # 거래량 순위(인덱스)와 이름 순서가 겹치지 않도록 섞음
+    order = np.random.default_rng(seed).permutation(n_complexes)
+    return [names[i] for i in order]
+
+def format_price_strings(values):
+    """만원 단위 정수를 API 형식 문자열(예: '123,500')로 변환"""
+    return pd.Series(values).map("{:,}".format).to_numpy(dtype=object)
+
+def make_synthetic_transactions(
+    n_rows,
+    trade_type="매매",
+    sigungu_code="11710",
+    start_ym="202301",
+    end_ym="202412",
+    n_complexes=300,
+    seed=0,
+    korean_columns=True,
+    cancel_ratio=0.01,
+):
+    """지정 기간에 걸친 합성 거래 n_rows건 생성 (가격은 쉼표 문자열, 단지 거래량은 롱테일 분포)"""
+    rng = np.random.default_rng(synthetic_seed(seed, trade_type, sigungu_code, start_ym, end_ym, n_rows))
+    complexes = synthetic_complex_names(n_complexes, seed=synthetic_seed(seed, sigungu_code))
+    popularity = 1.0 / np.arange(1, n_complexes + 1) ** 0.9
+    complex_idx = rng.choice(n_complexes, size=n_rows, p=popularity / popularity.sum())
+    premium = np.random.default_rng(synthetic_seed(seed, sigungu_code, "premium")).lognormal(0.0, 0.25, n_complexes)
+    build_years = np.random.default_rng(synthetic_seed(seed, sigungu_code, "built")).integers(1985, 2024, n_complexes)
+
+    start = pd.Period(f"{start_ym[:4]}-{start_ym[4:]}", freq="M")
+    end = pd.Period(f"{end_ym[:4]}-{end_ym[4:]}", freq="M")
+    n_months = max(1, end.ordinal - start.ordinal + 1)
+    month_offset = rng.integers(0, n_months, n_rows)
+    periods = pd.PeriodIndex.from_ordinals(start.ordinal + month_offset, freq="M")
+
+    areas = rng.choice(SYNTHETIC_AREAS, size=n_rows, p=SYNTHETIC_AREA_WEIGHTS / SYNTHETIC_AREA_WEIGHTS.sum())
+    # 시간 경과에 따른 완만한 가격 상승 + 단지 프리미엄 + 개별 거래 잡음
+    trend = 1.0 + 0.004 * month_offset
+    base_price = areas * 1450.0 * premium[complex_idx] * trend * rng.lognormal(0.0, 0.08, n_rows)
+
+    data = {
+        "sggCd": np.full(n_rows, str(sigungu_code), dtype=object),
+        "umdNm": np.asarray(SYNTHETIC_DONGS, dtype=object)[complex_idx % len(SYNTHETIC_DONGS)],
+        "aptNm": np.asarray(complexes, dtype=object)[complex_idx],
+        "jibun": (complex_idx * 7 % 400 + 1).astype(str).astype(object),
+        "excluUseAr": areas,
+        "dealYear": periods.year.to_numpy(),
+        "dealMonth": periods.month.to_numpy(),
+        "dealDay": rng.integers(1, 29, n_rows),
+    }
+    if trade_type == "매매":
+        data["dealAmount"] = format_price_strings((base_price // 10 * 10).astype(np.int64))
+    else:
+        is_monthly = rng.random(n_rows) < 0.45
+        deposit = np.where(is_monthly, base_price * rng.uniform(0.05, 0.35, n_rows), base_price * 0.55)
+        rent = np.where(is_monthly, np.maximum(10, (base_price * 0.55 - deposit) * 0.045 / 12), 0)
+        data["deposit"] = format_price_strings((deposit // 100 * 100).astype(np.int64))
+        data["monthlyRent"] = format_price_strings(rent.astype(np.int64))
+    data["floor"] = rng.integers(1, 36, n_rows)
+    data["buildYear"] = build_years[complex_idx]
+    if trade_type == "매매":
+        cancelled = rng.random(n_rows) < cancel_ratio
+        data["cdealType"] = np.where(cancelled, "O", "").astype(object)
+        data["cdealDay"] = np.where(cancelled, "24.01.15", "").astype(object)
+    else:
+        data["contractTerm"] = np.where(rng.random(n_rows) < 0.6, "24.03~26.03", "").astype(object)
+        data["contractType"] = np.where(rng.random(n_rows) < 0.3, "갱신", "신규").astype(object)
+
+    df = pd.DataFrame(data)
+    if korean_columns:
+        df = df.rename(columns=KOREAN_COLUMN_NAMES)
+    return df
+
+def make_synthetic_month(trade_type, sigungu_code, year_month, n_rows=400, seed=0, korean_columns=True):
+    """단일 시군구·월의 합성 응답 생성 (같은 인자는 항상 같은 결과)"""
+    return make_synthetic_transactions(
+        n_rows,
+        trade_type=trade_type,
+        sigungu_code=sigungu_code,
+        start_ym=year_month,
+        end_ym=year_month,
+        seed=seed,
+        korean_columns=korean_columns,
+    )